@@ -0,0 +1,246 @@
+"""
+基准结果历史库与回归检测
+
+把基准输出的 JSON（含 ``fingerprint``）记录到本地 SQLite，按基准名、
+运行环境指纹和 git 版本索引；``compare`` 对两次运行逐项比较，
+用 Mann-Whitney U 检验判断变慢是否显著。
+
+用法：
+    python bench_history.py record results.json          # 记录一次运行（同一文件重复记录会被跳过）
+    python bench_history.py list                          # 列出已记录的运行
+    python bench_history.py compare BASE CANDIDATE        # 比较两次运行
+BASE / CANDIDATE 可以是运行编号、``rev:<git 版本前缀>`` 或
+``python:<版本>``（含 ABI 标志，如 ``python:3.14.0t``），取匹配的最近一次运行。
+默认比较中位数耗时；没有中位数的基准（如 ``load``）用 ``--metric run_secs``。
+发现显著回归时以状态码 1 退出，可直接用于 CI。
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import sqlite3
+import sys
+from pathlib import Path
+from statistics import NormalDist
+
+from check_python_version import git_rev
+
+DEFAULT_DB = Path(__file__).resolve().parent / ".bench_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    benchmark TEXT NOT NULL,
+    fingerprint_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    python TEXT,
+    git_rev TEXT,
+    created TEXT,
+    params TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (benchmark, fingerprint_id, git_rev);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    samples TEXT
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+"""
+
+# 每次运行都会变化、不属于"同一环境"判断依据的指纹字段。
+VOLATILE = ("loadavg", "executable")
+
+# 结果中表示统计量而非"这是哪一项"的整数字段。
+STAT_KEYS = {"n"}
+
+
+def fingerprint_id(fp: dict) -> str:
+    stable = {k: v for k, v in fp.items() if k not in VOLATILE}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def case_name(result: dict) -> str:
+    """结果项的名字：字符串 / 整数字段，如 ``backend=process,workers=4``。"""
+    keys = sorted(k for k, v in result.items()
+                  if k not in STAT_KEYS and isinstance(v, (str, int)) and not isinstance(v, bool))
+    return ",".join(f"{k}={result[k]}" for k in keys) or "all"
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def record(db: sqlite3.Connection, doc: dict, rev: str | None) -> int:
+    fp = doc.get("fingerprint")
+    if fp is None:
+        raise ValueError("result file has no 'fingerprint'; re-run the benchmark with --json")
+    fid = fingerprint_id(fp)
+    dup = db.execute("SELECT id FROM runs WHERE benchmark = ? AND fingerprint_id = ? AND created IS ?",
+                     (doc["benchmark"], fid, doc.get("created"))).fetchone()
+    if dup:
+        raise ValueError(f"already recorded as run {dup[0]}")
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (benchmark, fingerprint_id, fingerprint, python, git_rev, created, params)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (doc["benchmark"], fid, json.dumps(fp),
+             fp.get("python", "") + fp.get("build", {}).get("abiflags", ""),
+             rev or doc.get("git_rev"), doc.get("created"), json.dumps(doc.get("params", {}))),
+        ).lastrowid
+        for result in doc.get("results", []):
+            name = case_name(result)
+            samples = result.get("samples")
+            for metric, value in result.items():
+                if isinstance(value, float) and math.isfinite(value):
+                    db.execute("INSERT INTO results VALUES (?, ?, ?, ?, ?)",
+                               (run_id, name, metric, value,
+                                json.dumps(samples) if samples and metric == "median" else None))
+    return run_id
+
+
+def select_run(db: sqlite3.Connection, selector: str, benchmark: str | None) -> tuple:
+    where, args = [], []
+    if benchmark:
+        where.append("benchmark = ?")
+        args.append(benchmark)
+    kind, _, value = selector.partition(":")
+    if selector.isdigit():
+        where.append("id = ?")
+        args.append(int(selector))
+    elif kind == "rev":
+        where.append("git_rev LIKE ?")
+        args.append(value + "%")
+    elif kind == "python":
+        where.append("python = ?")
+        args.append(value)
+    else:
+        raise ValueError(f"bad run selector {selector!r}: use an id, rev:<rev> or python:<version>")
+    row = db.execute(
+        "SELECT id, benchmark, python, git_rev, created FROM runs"
+        + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id DESC LIMIT 1", args,
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"no run matches {selector!r}")
+    return row
+
+
+def mann_whitney_greater(base: list[float], cand: list[float]) -> float:
+    """单侧 p 值：候选样本整体大于（更慢）基准样本的零假设检验（正态近似，含并列校正）。"""
+    n1, n2 = len(cand), len(base)
+    pooled = sorted([(x, 0) for x in cand] + [(x, 1) for x in base])
+    ranks = [0.0] * len(pooled)
+    ties = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, side) in zip(ranks, pooled) if side == 0)
+    u = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(var)
+    return 1 - NormalDist().cdf(z)
+
+
+def compare(db: sqlite3.Connection, base_id: int, cand_id: int, metric: str, alpha: float,
+            threshold: float) -> int:
+    """打印逐项对比，返回显著回归的数量。
+
+    ``metric`` 须是越小越好的指标（耗时）。两边都有原始样本时做
+    Mann-Whitney U 检验，p < ``alpha`` 且变慢超过 ``threshold`` 才算回归；
+    没有样本的项只报告变化，不下结论。
+    """
+    def load(run_id: int) -> dict:
+        rows = db.execute("SELECT name, value, samples FROM results WHERE run_id = ? AND metric = ?",
+                          (run_id, metric))
+        return {name: (value, json.loads(samples) if samples else None) for name, value, samples in rows}
+
+    base, cand = load(base_id), load(cand_id)
+    regressions = 0
+    print(f"{'case':<40} {'base':>10} {'cand':>10} {'change':>8} {'p':>7}  verdict")
+    for name in sorted(base.keys() & cand.keys()):
+        (b, bs), (c, cs) = base[name], cand[name]
+        change = c / b - 1 if b else math.inf
+        if bs and cs and len(bs) > 1 and len(cs) > 1:
+            p = mann_whitney_greater(bs, cs)
+            slower = p < alpha and change > threshold
+            faster = mann_whitney_greater(cs, bs) < alpha and change < -threshold
+            verdict = "REGRESSION" if slower else "faster" if faster else "same"
+            p_text = f"{p:.4f}"
+        else:
+            slower = False
+            verdict = "no samples"
+            p_text = "n/a"
+        regressions += slower
+        print(f"{name:<40} {b:>10.4g} {c:>10.4g} {change:>+8.1%} {p_text:>7}  {verdict}")
+    for name in sorted(base.keys() ^ cand.keys()):
+        print(f"{name:<40} only in {'base' if name in base else 'candidate'}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark history and regression checks")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="store a benchmark's --json output")
+    rec.add_argument("files", nargs="+", type=Path)
+    rec.add_argument("--rev", help="git revision (default: from the file, else HEAD)")
+    ls = sub.add_parser("list", help="show recorded runs")
+    ls.add_argument("--benchmark")
+    cmp_ = sub.add_parser("compare", help="flag significant slowdowns from BASE to CANDIDATE")
+    cmp_.add_argument("base")
+    cmp_.add_argument("candidate")
+    cmp_.add_argument("--benchmark")
+    cmp_.add_argument("--metric", default="median", help="lower-is-better metric to compare")
+    cmp_.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    cmp_.add_argument("--threshold", type=float, default=0.03,
+                      help="ignore slowdowns smaller than this fraction")
+    args = parser.parse_args()
+    db = connect(args.db)
+
+    if args.command == "record":
+        for path in args.files:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+            rev = args.rev or doc.get("git_rev") or git_rev()
+            try:
+                run_id = record(db, doc, rev)
+            except ValueError as e:
+                print(f"skipped {path}: {e}", file=sys.stderr)
+                continue
+            print(f"recorded run {run_id}: {doc['benchmark']} @ {rev or '?'}")
+    elif args.command == "list":
+        query = "SELECT id, benchmark, python, fingerprint_id, git_rev, created FROM runs"
+        rows = db.execute(query + " WHERE benchmark = ? ORDER BY id", (args.benchmark,)) if args.benchmark \
+            else db.execute(query + " ORDER BY id")
+        print(f"{'id':>4} {'benchmark':<28} {'python':<10} {'fingerprint':<12} {'rev':<10} created")
+        for run_id, bench, python, fid, rev, created in rows:
+            print(f"{run_id:>4} {bench:<28} {python or '?':<10} {fid:<12} {rev or '?':<10} {created or ''}")
+    else:
+        try:
+            base = select_run(db, args.base, args.benchmark)
+            cand = select_run(db, args.candidate, args.benchmark or base[1])
+        except ValueError as e:
+            parser.error(str(e))
+        if base[1] != cand[1]:
+            parser.error(f"runs are of different benchmarks: {base[1]} vs {cand[1]}")
+        print(f"base      run {base[0]}: {base[1]} python {base[2]} rev {base[3]} ({base[4]})")
+        print(f"candidate run {cand[0]}: {cand[1]} python {cand[2]} rev {cand[3]} ({cand[4]})")
+        if compare(db, base[0], cand[0], args.metric, args.alpha, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
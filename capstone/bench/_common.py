@@ -0,0 +1,41 @@
+"""Shared helpers for the capstone benchmarks."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+ROOT = SRC.parent.parent  # check_python_version.py lives here
+for path in (SRC, ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from check_python_version import fingerprint, git_rev, print_environment  # noqa: E402, F401
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(script: str, *args: object) -> dict:
+    """Run ``script --child *args`` in a fresh interpreter and decode its JSON line.
+
+    Peak RSS is monotonic per process, so every measurement gets its own.
+    """
+    out = subprocess.run(
+        [sys.executable, script, "--child", *map(str, args)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
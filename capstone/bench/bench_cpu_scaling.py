@@ -0,0 +1,56 @@
+"""Scaling of the cpu task backends over 1/2/4/8/16 workers.
+
+Run once per interpreter build to compare them, e.g.
+    python   capstone/bench/bench_cpu_scaling.py
+    python3.14t capstone/bench/bench_cpu_scaling.py
+"""
+
+import argparse
+import asyncio
+import math
+import time
+
+from _common import print_environment
+
+from pools import CpuPool
+
+WORKERS = (1, 2, 4, 8, 16)
+
+
+def kernel(n: int) -> int:
+    s = 0
+    for i in range(1, n):
+        s += int(math.sqrt(i))
+    return s
+
+
+async def measure(backend: str, workers: int, jobs: int, n: int) -> float:
+    pool = CpuPool(backend, workers)
+    try:
+        await pool.call(kernel, 1)  # start workers outside the timed region
+        t0 = time.perf_counter()
+        await pool.map(kernel, [n] * jobs)
+        return time.perf_counter() - t0
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKERS)
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args()
+    print_environment()
+    print(f"{args.jobs} jobs of n={args.n}")
+    print(f"{'backend':<8} {'workers':>7} {'secs':>7} {'speedup':>8}")
+    for backend in ("thread", "process"):
+        base = None
+        for workers in args.workers:
+            dur = asyncio.run(measure(backend, workers, args.jobs, args.n))
+            base = base or dur
+            print(f"{backend:<8} {workers:>7} {dur:>7.3f} {base / dur:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
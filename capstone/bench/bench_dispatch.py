@@ -0,0 +1,60 @@
+"""Per-task dispatch cost: structural ``match`` vs. registry dict lookup.
+
+Run with Python >=3.11:  python capstone/bench/bench_dispatch.py
+"""
+
+import argparse
+import random
+import timeit
+
+from _common import print_environment
+
+TYPE_COUNTS = (10, 50, 100, 500)
+TASKS = 10_000
+
+
+def make_match(n: int):
+    """Build ``dispatch(task)`` with one ``case`` per type, like the old Runner.run."""
+    cases = "".join(
+        f'        case {{"type": "t{i}", "arg": arg}}:\n            return handle(arg)\n'
+        for i in range(n)
+    )
+    src = f"def dispatch(task):\n    match task:\n{cases}        case _:\n            return None\n"
+    ns = {"handle": handle}
+    exec(src, ns)
+    return ns["dispatch"]
+
+
+def make_registry(n: int):
+    handlers = {f"t{i}": (lambda task: handle(task["arg"])) for i in range(n)}
+
+    def dispatch(task):
+        return handlers[task["type"]](task)
+
+    return dispatch
+
+
+def handle(arg):
+    return arg
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--types", type=int, nargs="+", default=TYPE_COUNTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    print_environment()
+    print(f"{'types':>6} {'match ns/task':>14} {'dict ns/task':>13} {'speedup':>8}")
+    for n in args.types:
+        tasks = [{"type": f"t{rng.randrange(n)}", "arg": 1} for _ in range(TASKS)]
+        results = []
+        for dispatch in (make_match(n), make_registry(n)):
+            loop = lambda: [dispatch(t) for t in tasks]  # noqa: E731
+            best = min(timeit.repeat(loop, number=1, repeat=args.repeat))
+            results.append(best / TASKS * 1e9)
+        print(f"{n:>6} {results[0]:>14.0f} {results[1]:>13.0f} {results[0] / results[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Completion-journal overhead (CPU time) on a 100k-echo-task run.
+
+Run with Python >=3.11:  python capstone/bench/bench_journal.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+from _common import print_environment
+
+from main import Runner
+
+
+def run_once(n: int, journal: str | None) -> float:
+    cfg: dict = {"scheduler": {"max_concurrency": 256}}
+    if journal:
+        cfg["journal"] = {"path": journal}
+    tasks = ({"type": "echo", "msg": "x", "id": f"t{i}"} for i in range(n))
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        runner = Runner(cfg, tasks)
+        t0 = time.process_time()
+        asyncio.run(runner.run())
+        return time.process_time() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    plain, journaled = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.journal")
+        for _ in range(args.repeat):
+            plain.append(run_once(args.tasks, None))
+            journaled.append(run_once(args.tasks, path))
+        size = os.path.getsize(path)
+    a, b = min(plain), min(journaled)
+    print_environment()
+    print(f"{args.tasks} echo tasks, min CPU seconds over {args.repeat} runs")
+    print(f"plain      {a:.3f}")
+    print(f"journaled  {b:.3f}  overhead {100 * (b - a) / a:+.2f}%  (journal {size / 1024:.0f} KiB after compaction)")
+
+
+if __name__ == "__main__":
+    main()
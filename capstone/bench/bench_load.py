@@ -0,0 +1,158 @@
+"""Synthetic-load suite: startup, throughput, overhead and memory vs. manifest size.
+
+Generates sharded manifests of mixed echo/sleep/cpu tasks and runs each
+through several execution strategies, one fresh interpreter per run:
+
+- ``direct``     await each task in turn (the baseline for overhead);
+- ``scheduler``  the Runner's bounded admission (``max_concurrency``);
+- ``taskgroup``  one TaskGroup task per manifest task, all at once;
+- ``gather``     ``asyncio.gather`` over every task;
+- ``semaphore``  every task created up front, gated by a Semaphore.
+
+Per-task overhead is the extra wall time per task over ``direct``.
+``--json`` writes the results, with the environment fingerprint and git
+revision, so runs can be compared across commits.
+
+Run with Python >=3.11:
+    python capstone/bench/bench_load.py --json load.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+T0 = time.perf_counter()  # before the capstone modules are imported
+
+from _common import fingerprint, git_rev, peak_rss_mb, print_environment, run_child  # noqa: E402
+
+SIZES = (1_000, 100_000, 1_000_000)
+STRATEGIES = ("direct", "scheduler", "taskgroup", "gather", "semaphore")
+CONCURRENCY = 256
+SHARD_SIZE = 10_000
+
+
+def write_manifest(directory: Path, n: int) -> None:
+    """Write ``n`` tasks as shards: 70% echo, 25% zero sleeps, 5% tiny cpu calls."""
+    for start in range(0, n, SHARD_SIZE):
+        lines = []
+        for i in range(start, min(n, start + SHARD_SIZE)):
+            if i % 20 == 0:
+                lines.append(f'[[tasks]]\ntype = "cpu"\nfn = "math:factorial"\nargs = [{i % 50}]\n')
+            elif i % 4 == 1:
+                lines.append('[[tasks]]\ntype = "sleep"\nsecs = 0\n')
+            else:
+                lines.append(f'[[tasks]]\ntype = "echo"\nmsg = "task {i}"\n')
+        (directory / f"{start // SHARD_SIZE:05d}.toml").write_text("\n".join(lines))
+
+
+async def drive(strategy: str, runner, first: list[float]) -> None:
+    dispatch = runner._dispatch
+
+    async def timed(task: dict) -> bool:
+        if not first:
+            first.append(time.perf_counter())
+        return await dispatch(task)
+
+    if strategy == "scheduler":
+        runner._dispatch = timed
+        await runner.run()
+        return
+    try:
+        if strategy == "direct":
+            for task in runner.tasks:
+                await timed(task)
+        elif strategy == "taskgroup":
+            async with asyncio.TaskGroup() as tg:
+                for task in runner.tasks:
+                    tg.create_task(timed(task))
+        elif strategy == "gather":
+            await asyncio.gather(*map(timed, runner.tasks))
+        elif strategy == "semaphore":
+            sem = asyncio.Semaphore(CONCURRENCY)
+
+            async def gated(task: dict) -> bool:
+                async with sem:
+                    return await timed(task)
+
+            async with asyncio.TaskGroup() as tg:
+                for task in runner.tasks:
+                    tg.create_task(gated(task))
+    finally:
+        runner.cpu.shutdown()
+        runner.out.close()
+
+
+def child(strategy: str, n: int, directory: str) -> None:
+    import manifest
+    from main import Runner
+
+    imported = time.perf_counter()
+    _, tasks = manifest.load(directory)
+    cfg = {
+        "scheduler": {"max_concurrency": CONCURRENCY},
+        "pools": {"cpu": {"backend": "thread", "workers": 1}},
+    }
+    runner = Runner(cfg, tasks)
+    first: list[float] = []
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        t0 = time.perf_counter()
+        asyncio.run(drive(strategy, runner, first))
+        end = time.perf_counter()
+    print(json.dumps({
+        "strategy": strategy,
+        "tasks": n,
+        "import_secs": imported - T0,
+        "startup_secs": first[0] - T0 if first else None,
+        "run_secs": end - t0,
+        "tasks_per_sec": n / (end - t0),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", nargs=3, metavar=("STRATEGY", "N", "DIR"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=STRATEGIES)
+    parser.add_argument("--json", metavar="PATH", help="also write the results here")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], int(args.child[1]), args.child[2])
+        return
+    results = []
+    print_environment()
+    print(f"{'strategy':<10} {'tasks':>8} {'startup ms':>11} {'tasks/s':>10} "
+          f"{'overhead us':>12} {'peak RSS MiB':>13}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_manifest(Path(tmp), n)
+            base = None
+            for strategy in args.strategies:
+                r = run_child(__file__, strategy, n, tmp)
+                if strategy == "direct":
+                    base = r["run_secs"]
+                r["overhead_us"] = (r["run_secs"] - base) / n * 1e6 if base is not None else None
+                results.append(r)
+                startup = f"{r['startup_secs'] * 1e3:.1f}" if r["startup_secs"] is not None else "n/a"
+                overhead = f"{r['overhead_us']:.2f}" if r["overhead_us"] is not None else "n/a"
+                rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+                print(f"{strategy:<10} {n:>8} {startup:>11} {r['tasks_per_sec']:>10.0f} "
+                      f"{overhead:>12} {rss:>13}")
+    if args.json:
+        doc = {
+            "benchmark": "load",
+            "fingerprint": fingerprint(),
+            "git_rev": git_rev(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        Path(args.json).write_text(json.dumps(doc, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Time-to-first-task for a monolithic config vs. a directory of shards,
+parsing the TOML vs. loading the parsed-config cache.
+
+Run with Python >=3.11:  python capstone/bench/bench_manifest.py
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from _common import print_environment
+
+import manifest
+from main import Runner
+
+SIZES = (1_000, 10_000, 100_000)
+SHARD_SIZE = 1_000
+
+
+def task_toml(i: int) -> str:
+    return f'[[tasks]]\ntype = "sleep"\nsecs = 0\nid = "t{i}"\n\n'
+
+
+def write_manifests(root: Path, n: int) -> tuple[Path, Path]:
+    mono = root / "config.toml"
+    mono.write_text("".join(task_toml(i) for i in range(n)))
+    shards = root / "tasks.d"
+    shards.mkdir()
+    for start in range(0, n, SHARD_SIZE):
+        body = "".join(task_toml(i) for i in range(start, min(n, start + SHARD_SIZE)))
+        (shards / f"{start // SHARD_SIZE:06d}.toml").write_text(body)
+    return mono, shards
+
+
+async def first_task_latency(path: Path, cache: bool) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    first: list[float] = []
+    cfg, tasks = manifest.load(path, cache)
+    runner = Runner({**cfg, "scheduler": {"max_concurrency": 256}}, tasks)
+
+    async def dispatch(task: Mapping[str, Any]) -> bool:
+        if not first:
+            first.append(time.perf_counter() - t0)
+        return True
+
+    await runner.scheduler.run(runner.tasks, dispatch)
+    return first[0], time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+    print_environment()
+    print(f"{'layout':<8} {'tasks':>8} {'source':<7} {'first task ms':>14} {'total s':>8}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            for layout, path in zip(("single", "shards"), write_manifests(Path(tmp), n)):
+                for source, cache in (("toml", False), ("cache", True)):
+                    if cache:
+                        list(manifest.load(path, cache=True)[1])  # write the cache files
+                    ttft, total = asyncio.run(first_task_latency(path, cache))
+                    print(f"{layout:<8} {n:>8} {source:<7} {ttft * 1e3:>14.1f} {total:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Instrumentation overhead (CPU time) on a 100k-echo-task run.
+
+Run with Python >=3.11:  python capstone/bench/bench_metrics.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import time
+
+from _common import print_environment
+
+from main import Runner
+
+
+def run_once(n: int, instrumented: bool) -> float:
+    cfg: dict = {"scheduler": {"max_concurrency": 256}}
+    if instrumented:
+        cfg["metrics"] = {"json": os.devnull}
+    tasks = ({"type": "echo", "msg": "x"} for _ in range(n))
+    runner = Runner(cfg, tasks)
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        t0 = time.process_time()
+        asyncio.run(runner.run())
+        return time.process_time() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    run_once(1_000, True)  # warm up imports and allocators
+    plain, instrumented = [], []
+    for _ in range(args.repeat):  # interleave to spread out machine noise
+        plain.append(run_once(args.tasks, False))
+        instrumented.append(run_once(args.tasks, True))
+    # The minimum is the least disturbed run; medians shown for context.
+    a, b = min(plain), min(instrumented)
+    print_environment()
+    print(f"{args.tasks} echo tasks, CPU seconds over {args.repeat} runs (min / median)")
+    print(f"plain         {a:.3f} / {statistics.median(plain):.3f}")
+    print(f"instrumented  {b:.3f} / {statistics.median(instrumented):.3f}")
+    print(f"overhead      {100 * (b - a) / a:+.2f}%  ({(b - a) / args.tasks * 1e9:.0f} ns/task)")
+
+
+if __name__ == "__main__":
+    main()
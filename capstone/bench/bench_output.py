@@ -0,0 +1,75 @@
+"""Echo throughput: per-task ``print`` vs. the buffered output sink.
+
+Run with Python >=3.11:  python capstone/bench/bench_output.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import print_environment
+
+from main import Runner
+from output import OutputSink
+
+SIZES = (10_000, 100_000)
+
+
+class PrintRunner(Runner):
+    """The previous behaviour: one ``print`` per echo task."""
+
+    def __init__(self, *args, flush: bool, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.flush = flush
+
+    async def _echo(self, msg: str) -> None:
+        print(msg, file=self.out.stream, flush=self.flush)
+
+
+def run(mode: str, n: int, stream) -> float:
+    cfg = {"scheduler": {"max_concurrency": 256}}
+    tasks = ({"type": "echo", "msg": f"task {i}"} for i in range(n))
+    if mode.startswith("print"):
+        runner: Runner = PrintRunner(cfg, tasks, flush=mode == "print+flush")
+    else:
+        runner = Runner(cfg, tasks)
+    runner.out = OutputSink(stream, ordered=mode == "sink-ordered")
+    t0 = time.perf_counter()
+    asyncio.run(runner.run())
+    return time.perf_counter() - t0
+
+
+@contextlib.contextmanager
+def open_target(target: str, tmp: str):
+    if target == "file":
+        with open(os.path.join(tmp, "out.txt"), "w") as f:
+            yield f
+        return
+    # A child draining the pipe, like `main.py | consumer`.
+    drain = "import sys\nfor _ in sys.stdin: pass"
+    with subprocess.Popen([sys.executable, "-c", drain], stdin=subprocess.PIPE, text=True) as proc:
+        yield proc.stdin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+    print_environment()
+    print("print+flush is what a line-buffered stdout (terminal, python -u) does per task")
+    print(f"{'target':<6} {'mode':<13} {'tasks':>8} {'tasks/s':>10}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            for target in ("file", "pipe"):
+                for mode in ("print", "print+flush", "sink", "sink-ordered"):
+                    with open_target(target, tmp) as stream:
+                        dur = run(mode, n, stream)
+                    print(f"{target:<6} {mode:<13} {n:>8} {n / dur:>10.0f}")
+
+if __name__ == "__main__":
+    main()
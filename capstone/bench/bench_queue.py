@@ -0,0 +1,90 @@
+"""Queue throughput vs. worker count: one coordinator, N local worker processes.
+
+Writes a manifest of identical tasks, then for each worker count runs
+``main.py CONFIG --queue DB --workers N`` on a fresh queue and reports
+tasks per second, speedup over one worker and scaling efficiency.
+Wall time includes worker start-up, so use enough tasks to amortise it.
+
+- ``sleep``  latency-bound tasks, ``--concurrency`` at a time per worker;
+- ``cpu``    pure-Python CPU work on a one-thread pool, so each worker
+  process is one core and scaling is bounded by the CPU count.
+
+Run with Python >=3.11:
+    python capstone/bench/bench_queue.py --workers 1 2 4 --json queue.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _common import SRC, fingerprint, git_rev, print_environment
+
+SHARD_SIZE = 10_000
+
+
+def write_config(directory: Path, workload: str, n: int, concurrency: int, secs: float) -> Path:
+    (directory / "tasks.d").mkdir()
+    if workload == "sleep":
+        task = f'[[tasks]]\ntype = "sleep"\nsecs = {secs}\n'
+    else:
+        task = '[[tasks]]\ntype = "cpu"\nfn = "math:factorial"\nargs = [20000]\n'
+    for start in range(0, n, SHARD_SIZE):
+        shard = directory / "tasks.d" / f"{start // SHARD_SIZE:05d}.toml"
+        shard.write_text("\n".join([task] * (min(n, start + SHARD_SIZE) - start)))
+    config = directory / "config.toml"
+    config.write_text(
+        f'[manifest]\nshards = "tasks.d"\n\n[scheduler]\nmax_concurrency = {concurrency}\n\n'
+        '[pools.cpu]\nbackend = "thread"\nworkers = 1\n'
+    )
+    return config
+
+
+def run(config: Path, db: Path, workers: int) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, str(SRC / "main.py"), str(config), "--queue", str(db),
+                    "--workers", str(workers)], check=True, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", choices=("sleep", "cpu"), default="sleep")
+    parser.add_argument("--tasks", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency per worker")
+    parser.add_argument("--secs", type=float, default=0.01, help="sleep task duration")
+    parser.add_argument("--json", metavar="PATH", help="also write the results here")
+    args = parser.parse_args()
+    results = []
+    print_environment()
+    print(f"{args.tasks} {args.workload} tasks")
+    print(f"{'workers':>7} {'wall s':>8} {'tasks/s':>9} {'speedup':>8} {'efficiency':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        config = write_config(Path(tmp), args.workload, args.tasks, args.concurrency, args.secs)
+        for workers in args.workers:
+            wall = run(config, Path(tmp) / f"queue-{workers}.db", workers)
+            rate = args.tasks / wall
+            base = results[0]["tasks_per_sec"] / results[0]["workers"] if results else rate / workers
+            speedup = rate / base
+            results.append({"workers": workers, "wall_secs": wall, "tasks_per_sec": rate,
+                            "speedup": speedup, "efficiency": speedup / workers})
+            print(f"{workers:>7} {wall:>8.2f} {rate:>9.0f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+    if args.json:
+        doc = {
+            "benchmark": "queue",
+            "params": {k: v for k, v in vars(args).items() if k != "json"},
+            "fingerprint": fingerprint(),
+            "git_rev": git_rev(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        Path(args.json).write_text(json.dumps(doc, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Throughput and 429s against a rate-limited stub service, with and without
+the Runner's per-type token bucket.
+
+The stub is a local HTTP server that admits ``RATE`` requests per second
+(bursts of ``BURST``) and answers 429 beyond that. A ``call`` task sends
+one request; rejected calls are counted, not retried, so the 429 column
+is exactly the number of requests the limiter failed to hold back. The
+client bucket gets half the stub's burst as headroom for network jitter.
+
+The ``timeout`` client adds the isolation policy with a per-task timeout
+shorter than the queue of waiters: time spent waiting for a token must
+not count against it. The run exits non-zero if a limited client got any
+429 or failed task, so it doubles as a check of the limiter.
+
+Run with Python >=3.11:  python capstone/bench/bench_ratelimit.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from _common import print_environment
+
+from main import Runner
+from ratelimit import TokenBucket
+from registry import register
+
+RATE = 200.0
+BURST = 20
+TASKS = 1_000
+
+
+class Stub:
+    """Minimal HTTP/1.0 server enforcing its own token bucket."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.ok = 0
+        self.rejected = 0
+
+    def admit(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        if self.admit():
+            self.ok += 1
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Length: 2\r\n\r\nok")
+        else:
+            self.rejected += 1
+            writer.write(b"HTTP/1.0 429 Too Many Requests\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+
+@register("call", port=int)
+async def call(runner: Runner, task: Mapping[str, Any]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", task["port"])
+    writer.write(b"GET / HTTP/1.0\r\nHost: stub\r\n\r\n")
+    await writer.drain()
+    await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def measure(client: str, n: int, rate: float, burst: int) -> dict:
+    stub = Stub(rate, burst)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    cfg = {"scheduler": {"max_concurrency": 64}}
+    if client != "unlimited":
+        cfg["rate_limits"] = {"call": {"rate": rate, "burst": max(1, burst // 2)}}
+    if client == "timeout":
+        # 64 waiters drain in 64 / rate seconds, well past this timeout.
+        cfg["policy"] = {"isolate": True, "timeout": 8 / rate}
+    runner = Runner(cfg, ({"type": "call", "port": port} for _ in range(n)))
+    t0 = time.perf_counter()
+    async with server:
+        await runner.run(raise_errors=False)
+    dur = time.perf_counter() - t0
+    failed = len(runner.policy.errors) if runner.policy is not None else 0
+    return {"ok_per_sec": stub.ok / dur, "ok": stub.ok, "rejected": stub.rejected, "failed": failed,
+            "secs": dur}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=TASKS)
+    parser.add_argument("--rate", type=float, default=RATE)
+    parser.add_argument("--burst", type=int, default=BURST)
+    args = parser.parse_args()
+    TokenBucket(args.rate, args.burst)  # reject bad settings before starting the stub
+    print_environment()
+    print(f"stub ceiling {args.rate:g} req/s (burst {args.burst}), {args.tasks} calls")
+    print(f"{'client':<10} {'ok req/s':>9} {'ok':>6} {'429':>6} {'failed':>6} {'secs':>6}")
+    problems = []
+    for client in ("unlimited", "bucket", "timeout"):
+        r = asyncio.run(measure(client, args.tasks, args.rate, args.burst))
+        print(f"{client:<10} {r['ok_per_sec']:>9.1f} {r['ok']:>6} {r['rejected']:>6} {r['failed']:>6} "
+              f"{r['secs']:>6.2f}")
+        if client != "unlimited" and (r["rejected"] or r["failed"]):
+            problems.append(f"{client}: {r['rejected']} 429s, {r['failed']} failed tasks at the ceiling")
+    if problems:
+        sys.exit("; ".join(problems))
+
+
+if __name__ == "__main__":
+    main()
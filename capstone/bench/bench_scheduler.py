@@ -0,0 +1,56 @@
+"""Peak RSS and throughput of unbounded vs. scheduled Runner execution.
+
+Run with Python >=3.11:  python capstone/bench/bench_scheduler.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+from _common import peak_rss_mb, print_environment, run_child
+
+SIZES = (1_000, 10_000, 100_000, 200_000)
+
+
+def make_tasks(n: int):
+    for i in range(n):
+        if i % 2:
+            yield {"type": "sleep", "secs": 0}
+        else:
+            yield {"type": "echo", "msg": f"task {i}"}
+
+
+def child(mode: str, n: int) -> None:
+    from main import Runner
+
+    scheduler = {"max_concurrency": 256} if mode == "scheduled" else {}
+    runner = Runner({"scheduler": scheduler, "tasks": make_tasks(n)})
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        t0 = time.perf_counter()
+        asyncio.run(runner.run())
+        dur = time.perf_counter() - t0
+    print(json.dumps({"mode": mode, "n": n, "secs": dur, "tasks_per_sec": n / dur, "peak_rss_mb": peak_rss_mb()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "N"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+    print_environment()
+    print(f"{'mode':<10} {'tasks':>8} {'tasks/s':>10} {'peak RSS MiB':>13}")
+    for n in args.sizes:
+        for mode in ("unbounded", "scheduled"):
+            r = run_child(__file__, mode, n)
+            rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+            print(f"{mode:<10} {n:>8} {r['tasks_per_sec']:>10.0f} {rss:>13}")
+
+
+if __name__ == "__main__":
+    main()
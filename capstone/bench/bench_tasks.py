@@ -0,0 +1,59 @@
+"""Memory per task: parsed ``tomllib`` dicts vs. compact TaskRecords.
+
+Run with Python >=3.11:  python capstone/bench/bench_tasks.py
+"""
+
+import argparse
+import gc
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from _common import print_environment
+import main  # noqa: F401  (registers the built-in handlers)
+import manifest
+import registry
+from bench_load import write_manifest
+
+
+def traced(build) -> tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    tasks = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, tasks
+
+
+def lookup_ns(tasks: list) -> float:
+    def loop():
+        for t in tasks:
+            t["type"]
+            t.get("cache", True)
+    return min(timeit.repeat(loop, number=1, repeat=5)) / len(tasks) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        write_manifest(Path(tmp), args.tasks)
+        dict_bytes, dicts = traced(lambda: list(manifest.iter_shards(Path(tmp), cache=False)))
+        dict_ns = lookup_ns(dicts)
+        del dicts
+        record_bytes, records = traced(lambda: list(registry.validated(manifest.iter_shards(Path(tmp), cache=False))))
+        record_ns = lookup_ns(records)
+    n = args.tasks
+    print_environment()
+    print(f"{'form':<8} {'bytes/task':>11} {'lookup ns':>10}")
+    print(f"{'dict':<8} {dict_bytes / n:>11.0f} {dict_ns:>10.0f}")
+    print(f"{'record':<8} {record_bytes / n:>11.0f} {record_ns:>10.0f}")
+    print(f"saved {(dict_bytes - record_bytes) / n:.0f} bytes/task "
+          f"({1 - record_bytes / dict_bytes:.0%}) over {n} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Loop overhead and memory of ``asyncio`` timers vs. the timing wheel.
+
+Run with Python >=3.11:  python capstone/bench/bench_timers.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from _common import peak_rss_mb, print_environment, run_child
+
+from timewheel import TimingWheel
+
+SIZES = (10_000, 100_000, 1_000_000)
+SPREAD = 2.0  # delays are uniform in [0, SPREAD) seconds
+
+
+async def measure(mode: str, n: int, resolution: float) -> dict:
+    loop = asyncio.get_running_loop()
+    rng = random.Random(0)
+    wheel = TimingWheel(resolution)
+    done = asyncio.Event()
+    remaining = n
+    late: list[float] = []
+
+    def fired(fut: asyncio.Future, deadline: float, sample: bool) -> None:
+        nonlocal remaining
+        if sample:
+            late.append(loop.time() - deadline)
+        remaining -= 1
+        if not remaining:
+            done.set()
+
+    cpu0, t0 = time.process_time(), loop.time()
+    for i in range(n):
+        delay = rng.random() * SPREAD
+        if mode == "asyncio":
+            # What asyncio.sleep does under the hood: one heap entry per sleeper.
+            fut = loop.create_future()
+            loop.call_later(delay, fut.set_result, None)
+        else:
+            fut = wheel.wait(delay)
+        deadline = loop.time() + delay
+        fut.add_done_callback(lambda f, d=deadline, s=i % 100 == 0: fired(f, d, s))
+    await done.wait()
+    late.sort()
+    return {
+        "mode": mode,
+        "n": n,
+        "cpu_secs": time.process_time() - cpu0,
+        "wall_secs": loop.time() - t0,
+        "late_p50_ms": late[len(late) // 2] * 1e3,
+        "late_p99_ms": late[int(len(late) * 0.99)] * 1e3,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "N", "RESOLUTION"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--resolution", type=float, default=0.01)
+    args = parser.parse_args()
+    if args.child:
+        mode, n, res = args.child
+        print(json.dumps(asyncio.run(measure(mode, int(n), float(res)))))
+        return
+    print_environment()
+    print(f"delays uniform in [0, {SPREAD}) s, wheel resolution {args.resolution * 1e3:g} ms")
+    print(f"{'mode':<8} {'timers':>9} {'cpu s':>7} {'late p50 ms':>12} {'late p99 ms':>12} {'peak RSS MiB':>13}")
+    for n in args.sizes:
+        for mode in ("asyncio", "wheel"):
+            r = run_child(__file__, mode, n, args.resolution)
+            rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+            print(f"{mode:<8} {n:>9} {r['cpu_secs']:>7.2f} {r['late_p50_ms']:>12.2f} "
+                  f"{r['late_p99_ms']:>12.2f} {rss:>13}")
+
+
+if __name__ == "__main__":
+    main()
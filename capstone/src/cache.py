@@ -0,0 +1,70 @@
+"""Content-addressed on-disk cache of task output.
+
+Run with Python >=3.11
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+# Keys that only steer scheduling and so must not change a task's identity.
+VOLATILE_KEYS = frozenset({"id", "after", "priority", "cost", "cache"})
+
+
+class ResultCache:
+    """Map a stable hash of a task table and its ``inputs`` files to recorded output.
+
+    Entries live in ``directory/<2 hex>/<62 hex>.json`` and are written
+    atomically, so an interrupted run never leaves a torn entry behind.
+    Relative ``inputs`` are read from ``root`` (the manifest's directory
+    when run from the CLI), so the key does not depend on the working
+    directory.
+    """
+
+    def __init__(self, directory: str | os.PathLike, root: str | os.PathLike | None = None) -> None:
+        self.directory = Path(directory)
+        self.root = Path(root) if root is not None else Path()
+        umask = os.umask(0)
+        os.umask(umask)
+        self._mode = 0o666 & ~umask  # what open() gives a new file; mkstemp uses 0600
+
+    def key(self, task: Mapping[str, Any]) -> str:
+        h = hashlib.sha256()
+        table = {k: v for k, v in task.items() if k not in VOLATILE_KEYS}
+        h.update(json.dumps(table, sort_keys=True, separators=(",", ":"), default=str).encode())
+        for name in task.get("inputs", []):
+            h.update(b"\0" + name.encode() + b"\0")
+            try:
+                with open(self.root / name, "rb") as f:
+                    h.update(hashlib.file_digest(f, "sha256").digest())
+            except FileNotFoundError:
+                h.update(b"<missing>")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key[2:]}.json"
+
+    def get(self, key: str) -> dict | None:
+        try:
+            record: dict = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return record
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, record: dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = self._mode
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
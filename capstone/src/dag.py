@@ -0,0 +1,101 @@
+"""Dependency graph over tasks declaring ``after = [...]``.
+
+Run with Python >=3.11
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from registry import TaskError
+
+
+class CycleError(TaskError):
+    """The ``after`` edges contain a cycle."""
+
+
+# Seconds assumed for a task with no ``cost`` and no ``secs``: small, so a
+# chain of quick tasks does not outrank one real sleep.
+DEFAULT_COST = 0.01
+
+
+def cost(task: Mapping[str, Any]) -> float:
+    """Estimated run time in seconds, used for critical-path ranking."""
+    return float(task.get("cost", task.get("secs", DEFAULT_COST)))
+
+
+class Dag:
+    """Tasks plus their ``after`` edges, checked and ranked when built.
+
+    ``rank[i]`` is the cost of the longest path from task ``i`` to any sink,
+    so scheduling ready tasks by descending rank follows the critical path.
+    """
+
+    def __init__(self, tasks: Iterable[Mapping[str, Any]]) -> None:
+        self.tasks = list(tasks)
+        self._pos = {id(task): i for i, task in enumerate(self.tasks)}
+        index: dict[str, int] = {}
+        for i, task in enumerate(self.tasks):
+            if (tid := task.get("id")) is not None:
+                if tid in index:
+                    raise TaskError(f"duplicate task id {tid!r}")
+                index[tid] = i
+        self.deps: list[list[int]] = []
+        self.children: list[list[int]] = [[] for _ in self.tasks]
+        for i, task in enumerate(self.tasks):
+            after = task.get("after", [])
+            if not isinstance(after, list) or not all(isinstance(a, str) for a in after):
+                raise TaskError(f"task {task.get('id', i)!r}: 'after' must be a list of task ids")
+            try:
+                deps = [index[a] for a in after]
+            except KeyError as e:
+                raise TaskError(f"task {task.get('id', i)!r} depends on unknown id {e.args[0]!r}") from None
+            self.deps.append(deps)
+            for d in deps:
+                self.children[d].append(i)
+        self.waiting = [len(d) for d in self.deps]
+        order = self._topological_order()
+        self.rank = [0.0] * len(self.tasks)
+        for i in reversed(order):
+            self.rank[i] = cost(self.tasks[i]) + max((self.rank[c] for c in self.children[i]), default=0.0)
+        self.critical_path = max(self.rank, default=0.0)
+        self.total_cost = sum(cost(t) for t in self.tasks)
+
+    def _topological_order(self) -> list[int]:
+        indegree = list(self.waiting)
+        order = [i for i, n in enumerate(indegree) if n == 0]
+        for i in order:
+            for c in self.children[i]:
+                indegree[c] -= 1
+                if indegree[c] == 0:
+                    order.append(c)
+        if len(order) < len(self.tasks):
+            raise CycleError("dependency cycle: " + " -> ".join(self._find_cycle(indegree)))
+        return order
+
+    def _find_cycle(self, indegree: list[int]) -> list[str]:
+        # Every unresolved task has an unresolved dependency, so walking
+        # dependencies from any of them must revisit a task.
+        node = next(i for i, n in enumerate(indegree) if n)
+        seen: dict[int, int] = {}
+        path: list[int] = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(d for d in self.deps[node] if indegree[d])
+        cycle = path[seen[node]:][::-1]
+        return [str(self.tasks[i].get("id", i)) for i in cycle + cycle[:1]]
+
+    def roots(self) -> list[Mapping[str, Any]]:
+        return [t for i, t in enumerate(self.tasks) if not self.waiting[i]]
+
+    def priority(self, task: Mapping[str, Any]) -> float:
+        return self.rank[self._pos[id(task)]]
+
+    def complete(self, task: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+        """Mark ``task`` finished and return the tasks it made ready."""
+        ready = []
+        for c in self.children[self._pos[id(task)]]:
+            self.waiting[c] -= 1
+            if not self.waiting[c]:
+                ready.append(self.tasks[c])
+        return ready
@@ -0,0 +1,89 @@
+"""Append-only completion journal for resuming interrupted runs.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Protocol, Self
+
+
+class Completions(Protocol):
+    """Where the Runner reports finished task ids."""
+
+    done: set[str]
+
+    def record(self, task_id: str) -> None: ...
+
+    def fail(self, task_id: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class Journal:
+    """Record finished task ids, one per line, fsync'ed in batches.
+
+    A sync happens after ``batch`` records or ``interval`` seconds, whichever
+    comes first, so a crash loses at most that much progress and those
+    tasks simply run again on resume.
+    """
+
+    def __init__(self, path: str | os.PathLike, batch: int = 1024, interval: float = 1.0,
+                 resume: bool = False) -> None:
+        self.path = Path(path)
+        self.batch = batch
+        self.interval = interval
+        self.done = self.read(self.path) if resume else set()
+        self._f = open(self.path, "a" if resume else "w", encoding="utf-8")
+        self._pending = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def from_config(cls, cfg: dict, resume: bool = False) -> Self:
+        return cls(cfg["path"], cfg.get("batch", 1024), cfg.get("interval", 1.0), resume)
+
+    @staticmethod
+    def read(path: Path) -> set[str]:
+        """Ids in the journal; a torn final line (no newline) is ignored."""
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return set()
+        lines = text.split("\n")
+        return set(lines[:-1])
+
+    def record(self, task_id: str) -> None:
+        self._f.write(task_id + "\n")
+        self._pending += 1
+        if self._pending >= self.batch:
+            self.sync()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self.sync)
+
+    def fail(self, task_id: str) -> None:
+        """Failed tasks are not recorded; they run again on resume."""
+
+    def sync(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._pending = 0
+
+    def close(self) -> None:
+        """Sync, then rewrite the journal with each id once (atomic replace)."""
+        self.sync()
+        self._f.close()
+        ids = self.read(self.path)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(i + "\n" for i in sorted(ids))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, stat.S_IMODE(os.stat(self.path).st_mode))  # mkstemp made it 0600
+        os.replace(tmp, self.path)
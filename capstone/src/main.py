@@ -1,35 +1,324 @@
+import argparse
 import asyncio
-from typing import Self
-import tomllib
+import functools
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from pathlib import Path
+from typing import Any, Self
+
+import manifest
+import pools
+import registry
+import taskqueue
+from cache import ResultCache
+from dag import Dag
+from journal import Completions, Journal
+from metrics import Metrics
+from output import OutputSink, capture
+from policy import Policy
+from ratelimit import TokenBucket
+from registry import register
+from scheduler import Scheduler
+from timewheel import TimingWheel
+from watch import Watcher
 
 
 class Runner:
-    def __init__(self, cfg: dict) -> None:
+    def __init__(self, cfg: dict, tasks: Iterable[Mapping[str, Any]] | None = None, resume: bool = False,
+                 journal: Completions | None = None) -> None:
         self.cfg = cfg
+        dag = bool(cfg.get("scheduler", {}).get("dag"))
+        self.tasks = registry.validated(cfg.get("tasks", []) if tasks is None else tasks, dag)
+        if journal is None and cfg.get("journal", {}).get("path"):
+            journal = Journal.from_config(cfg["journal"], resume)
+        self.journal = journal
+        if self.journal is not None and self.journal.done and not dag:
+            self.tasks = (t for t in self.tasks if t.get("id") not in self.journal.done)
+        # DAG mode needs every task up front to check and rank the graph.
+        self.dag = Dag(self.tasks) if dag else None
+        self.metrics = Metrics.from_config(cfg["metrics"]) if "metrics" in cfg else None
+        self.scheduler = Scheduler.from_config(cfg.get("scheduler", {}), self.metrics)
+        self.cpu = pools.CpuPool.from_config(cfg.get("pools", {}).get("cpu", {}))
+        self.out = OutputSink.from_config(cfg.get("output", {}))
+        timers = cfg.get("timers", {})
+        self.wheel = TimingWheel.from_config(timers) if timers.get("wheel") else None
+        cache_dir = cfg.get("cache", {}).get("dir")
+        self.cache = ResultCache(cache_dir, cfg["cache"].get("root")) if cache_dir else None
+        policy = cfg.get("policy", {})
+        self.policy = Policy.from_config(policy) if policy.get("isolate") else None
+        self.first_dispatch: float | None = None
+        self.buckets = {kind: TokenBucket.from_config(limit)
+                        for kind, limit in cfg.get("rate_limits", {}).items()}
+
+    async def run(self, raise_errors: bool = True) -> None:
+        """Run every task; ``raise_errors=False`` leaves isolated failures in ``policy.errors``."""
+        ok = False
+        reporter = None
+        if self.metrics is not None and self.metrics.interval:
+            reporter = asyncio.create_task(self._report_metrics(self.metrics, self.metrics.interval))
+        try:
+            if self.dag is None:
+                await self.scheduler.run(self.tasks, self._dispatch)
+            else:
+                await self._run_dag(self.dag)
+            ok = True
+        finally:
+            self.cpu.shutdown(cancel=not ok)
+            self.out.close()
+            if self.journal is not None:
+                self.journal.close()
+            if reporter is not None:
+                reporter.cancel()
+            if self.metrics is not None:
+                self.metrics.export()
+        if self.policy is not None and raise_errors:
+            self.policy.raise_errors()
+
+    async def _run_dag(self, dag: Dag) -> None:
+        """Run tasks as their dependencies finish, longest remaining path first."""
+        busy = 0.0
+        peak = 0
+        finished = 0
+
+        async def node(task: Mapping[str, Any]) -> bool:
+            nonlocal busy, peak, finished
+            peak = max(peak, self.scheduler.running)
+            t0 = time.perf_counter()
+            if self.journal is not None and task.get("id") in self.journal.done:
+                ok = True  # finished in an earlier run; just release dependents
+            else:
+                ok = await self._dispatch(task)
+            busy += time.perf_counter() - t0
+            finished += 1
+            if ok:  # dependents of an isolated failure never become ready
+                for ready in dag.complete(task):
+                    self.scheduler.push(ready, dag.priority(ready))
+            return ok
+
+        for task in dag.roots():
+            self.scheduler.push(task, dag.priority(task))
+        t0 = time.perf_counter()
+        await self.scheduler.run((), node)
+        wall = time.perf_counter() - t0
+        ideal = dag.total_cost / dag.critical_path if dag.critical_path else 0.0
+        print(f"dag: {len(dag.tasks)} tasks, critical path {dag.critical_path:g}, "
+              f"parallelism peak {peak} / average {busy / wall if wall else 0.0:.2f} "
+              f"(ideal {ideal:.2f}), {len(dag.tasks) - finished} skipped", file=sys.stderr)
+
+    async def _dispatch(self, task: Mapping[str, Any]) -> bool:
+        """Run one task; False if it failed under the isolation policy."""
+        if self.first_dispatch is None:
+            self.first_dispatch = time.perf_counter()
+        fn = registry.HANDLERS[task["type"]].fn
+        attempt: Callable[[], Awaitable[object]]
+        if self.cache is not None and task.get("cache", True):
+            attempt = functools.partial(self._cached, fn, task)
+        else:
+            attempt = functools.partial(fn, self, task)
+        bucket = self.buckets.get(task["type"])
+        coro: Awaitable[object]
+        if self.policy is not None:
+            coro = self.policy.run(task, attempt, bucket)  # throttling is not timed
+        elif bucket is not None:
+            coro = self._limited(bucket, attempt)
+        else:
+            coro = attempt()
+        if not self.out.ordered:
+            ok = await coro is not False
+        else:
+            with self.out.slot():
+                ok = await coro is not False
+        if self.journal is not None and "id" in task:
+            if ok:
+                self.journal.record(task["id"])
+            else:
+                self.journal.fail(task["id"])
+        return ok
+
+    @staticmethod
+    async def _limited(bucket: TokenBucket, attempt: Callable[[], Awaitable[object]]) -> object:
+        await bucket.acquire()
+        return await attempt()
 
-    async def run(self) -> None:
-        tasks = self.cfg.get("tasks", [])
-        async with asyncio.TaskGroup() as tg:
-            for task in tasks:
-                match task:
-                    case {"type": "echo", "msg": msg}:
-                        tg.create_task(self._echo(msg))
-                    case {"type": "sleep", "secs": secs}:
-                        tg.create_task(asyncio.sleep(secs))
-                    case _:
-                        print("unknown task", task)
+    async def _cached(self, fn: registry.HandlerFn, task: Mapping[str, Any]) -> None:
+        """Replay recorded output on a cache hit, otherwise run and record."""
+        assert self.cache is not None  # only dispatched here when caching is on
+        key = self.cache.key(task)
+        if (hit := self.cache.get(key)) is not None:
+            for text in hit["output"]:
+                self.out.write(text)
+            return
+        with capture() as lines:
+            await fn(self, task)
+        self.cache.put(key, {"type": task["type"], "output": lines})
+
+    @staticmethod
+    async def _report_metrics(metrics: Metrics, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            metrics.export()
+
+    async def sleep(self, secs: float) -> None:
+        if self.wheel is None:
+            await asyncio.sleep(secs)
+        else:
+            await self.wheel.sleep(secs)
 
     async def _echo(self, msg: str) -> None:
-        print(msg)
+        self.out.write(msg + "\n")
 
 
-def main() -> None:
-    with open("capstone/src/config.toml", "rb") as f:
-        cfg = tomllib.load(f)
-    asyncio.run(Runner(cfg).run())
+@register("echo", msg=str)
+async def echo(runner: Runner, task: Mapping[str, Any]) -> None:
+    await runner._echo(task["msg"])
 
 
-if __name__ == "__main__":
-    main()
+@register("sleep", secs=int | float)
+async def sleep(runner: Runner, task: Mapping[str, Any]) -> None:
+    await runner.sleep(task["secs"])
+
+
+@register("cpu", fn=str)
+async def cpu(runner: Runner, task: Mapping[str, Any]) -> None:
+    """Run ``fn(*args)``, or ``fn(item)`` per entry of ``items``, in the CPU pool."""
+    fn = pools.resolve(task["fn"])
+    if "items" in task:
+        result = await runner.cpu.map(fn, task["items"], task.get("chunksize"))
+    else:
+        result = await runner.cpu.call(fn, *task.get("args", []))
+    if task.get("echo"):
+        await runner._echo(f"{task['fn']} -> {result}")
 
 
+def worker_config(cfg: dict) -> tuple[dict, int]:
+    """``cfg`` adjusted for a queue worker, and how many tasks to lease at a time.
+
+    A worker leases about one round of ``max_concurrency`` tasks and pulls
+    at most a window of them ahead, so the queue stays spread over all
+    workers. Failures are always isolated: one bad task goes back to the
+    queue instead of taking down the worker and every lease it holds.
+    """
+    sched = dict(cfg.get("scheduler", {}))
+    batch = sched.get("max_concurrency") or sched.get("window") or taskqueue.LEASE_BATCH
+    sched.setdefault("window", 4 * batch if sched.get("max_concurrency") else batch)
+    policy = {**cfg.get("policy", {}), "isolate": True}
+    return {**cfg, "scheduler": sched, "policy": policy}, batch
+
+
+async def run_worker(cfg: dict, queue: taskqueue.TaskQueue, poll: float = 0.5) -> int:
+    """Lease and run tasks until the queue has nothing left unfinished; return the failures."""
+    cfg, batch = worker_config(cfg)
+    failures = 0
+    while True:
+        session = taskqueue.WorkerSession(queue, batch=batch)
+        runner = Runner(cfg, session.tasks(), journal=session)
+        await runner.run(raise_errors=False)
+        assert runner.policy is not None  # worker_config forces isolate
+        for e in runner.policy.errors:
+            print(f"{type(e).__name__}: {e} ({'; '.join(getattr(e, '__notes__', []))})", file=sys.stderr)
+        failures += len(runner.policy.errors)
+        if not queue.unfinished():
+            return failures
+        await asyncio.sleep(poll)  # others hold the rest; wait for them or for expired leases
+
+
+async def run_watched(runner: Runner, watcher: Watcher) -> None:
+    """Run, then keep applying manifest edits until interrupted."""
+    runner.scheduler.keep_open()
+    poller = asyncio.create_task(watcher.run(runner.scheduler))
+    try:
+        await runner.run()
+    finally:
+        poller.cancel()
+
+
+def coordinate(cfg: dict, tasks: Iterable[Mapping[str, Any]], config: str, queue_path: str, workers: int) -> bool:
+    """Enqueue ``tasks`` and run ``workers`` local workers; False if anything was left undone."""
+    queue = taskqueue.TaskQueue(queue_path, **cfg.get("queue", {}))
+    added = queue.enqueue(registry.validated(tasks, dag=False))
+    print(f"queued {added} new task(s) in {queue_path}", file=sys.stderr)
+    procs = taskqueue.spawn_workers(workers, config, queue_path)
+    crashed = sum(proc.wait() != 0 for proc in procs)
+    if not procs:
+        return True
+    counts = queue.counts()
+    print(f"queue state: {counts}", file=sys.stderr)
+    if crashed:
+        print(f"{crashed} of {len(procs)} worker(s) exited with an error", file=sys.stderr)
+    return not crashed and not queue.unfinished() and not counts.get("failed")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Config-driven task orchestrator")
+    parser.add_argument("config", nargs="?", default="capstone/src/config.toml",
+                        help="config.toml or a directory of TOML task shards")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="reuse recorded output of unchanged tasks (overrides [cache] dir)")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="record finished task ids here (overrides [journal] path)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip tasks already recorded in the journal")
+    parser.add_argument("--queue", metavar="DB",
+                        help="SQLite task queue shared by a coordinator and its workers")
+    parser.add_argument("--role", choices=("coordinator", "worker"), default="coordinator",
+                        help="with --queue: enqueue the manifest, or lease and run tasks")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="coordinator: start this many local worker processes and wait")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and apply edits to the manifest as they are saved")
+    parser.add_argument("--no-parse-cache", dest="parse_cache", action="store_false",
+                        help="always parse TOML; do not read or write .<name>.cache files")
+    parser.add_argument("--timings", action="store_true",
+                        help="report start-up time (import, parse, first dispatch) on stderr")
+    args = parser.parse_args(argv)
+    imported = time.process_time()  # CPU time for interpreter start-up and imports
+    registry.load_entry_points()
+    t0 = time.perf_counter()
+    watcher = None
+    if args.watch:
+        watcher = Watcher(args.config, cache=args.parse_cache)
+        cfg, tasks = dict(watcher.cfg), watcher.current(watcher.tasks.values())
+    else:
+        cfg, tasks = manifest.load(args.config, cache=args.parse_cache)
+    parsed = time.perf_counter()
+    if args.cache:
+        cfg["cache"] = {**cfg.get("cache", {}), "dir": args.cache}
+    if cfg.get("cache", {}).get("dir"):
+        # Relative ``inputs`` name files beside the manifest, not in the working directory.
+        config = Path(args.config).resolve()
+        cfg["cache"].setdefault("root", str(config if config.is_dir() else config.parent))
+    if args.journal:
+        cfg["journal"] = {**cfg.get("journal", {}), "path": args.journal}
+    if args.resume and not cfg.get("journal", {}).get("path"):
+        parser.error("--resume needs --journal or [journal] path")
+    if watcher is not None and (args.queue or cfg.get("scheduler", {}).get("dag")):
+        parser.error("--watch cannot be combined with --queue or [scheduler] dag")
+    if args.timings and (args.queue or watcher is not None):
+        parser.error("--timings only applies to a plain run, not --queue or --watch")
+    if args.queue and cfg.get("scheduler", {}).get("dag"):
+        # Workers only see their own leases, so none could check or rank the whole graph.
+        parser.error("--queue cannot be combined with [scheduler] dag")
+    match (args.role if args.queue else None), watcher:
+        case "coordinator", _:
+            if not coordinate(cfg, tasks, args.config, args.queue, args.workers):
+                sys.exit(1)
+        case "worker", _:
+            queue = taskqueue.TaskQueue(args.queue, **cfg.get("queue", {}))
+            sys.exit(1 if asyncio.run(run_worker(cfg, queue)) else 0)
+        case None, Watcher():
+            try:
+                asyncio.run(run_watched(Runner(cfg, tasks, resume=args.resume), watcher))
+            except KeyboardInterrupt:
+                pass  # the usual way to leave watch mode
+        case _:
+            runner = Runner(cfg, tasks, resume=args.resume)
+            asyncio.run(runner.run())
+            if args.timings:
+                first = f"{(runner.first_dispatch - parsed) * 1e3:.1f} ms" if runner.first_dispatch else "n/a"
+                print(f"startup: import {imported * 1e3:.1f} ms (cpu), parse {(parsed - t0) * 1e3:.1f} ms, "
+                      f"first dispatch +{first}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load capstone settings and stream ``[[tasks]]`` from TOML shards.
+
+Run with Python >=3.11
+"""
+
+import itertools
+import os
+import pickle
+import tempfile
+import tomllib
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import registry
+
+# Bump when the cached layout changes so old cache files are ignored.
+CACHE_VERSION = 1
+
+
+def with_ids(tasks: Iterable[dict], source: str) -> Iterator[dict]:
+    """Give tasks without an explicit ``id`` a positional one, ``source#index``.
+
+    Ids stay stable as long as the manifest is unchanged, which is what the
+    completion journal needs to resume a run.
+    """
+    for i, task in enumerate(tasks):
+        task.setdefault("id", f"{source}#{i}")
+        yield task
+
+
+def cache_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.cache")
+
+
+def parse(path: Path, cache: bool = False) -> tuple[dict, Sequence[Mapping[str, Any]]]:
+    """Return ``(settings, tasks)`` for one TOML file, tasks with their ids.
+
+    With ``cache``, a file whose tasks all validate is also pickled as
+    settings plus compact records to ``.<name>.cache`` beside it. Later
+    calls load that instead, skipping both ``tomllib`` and validation, for
+    as long as the file's path, mtime and size and the registered handlers
+    are unchanged. Off by default, so library callers get plain dicts; the
+    CLI turns it on unless given ``--no-parse-cache``.
+    """
+    st = path.stat()
+    stamp = (CACHE_VERSION, str(path.resolve()), st.st_mtime_ns, st.st_size, registry.signature())
+    if cache:
+        try:
+            with open(cache_path(path), "rb") as f:
+                if pickle.load(f) == stamp:
+                    cached: tuple[dict, list[registry.TaskRecord]] = pickle.load(f)
+                    return cached
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+    with open(path, "rb") as f:
+        cfg = tomllib.load(f)
+    tasks = list(with_ids(cfg.pop("tasks", []), path.name))
+    if cache:
+        try:
+            for task in tasks:
+                registry.validate(task)
+        except registry.TaskError:
+            return cfg, tasks  # leave reporting to the Runner; cache once fixed
+        records = [registry.compact(task) for task in tasks]
+        try:
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(stamp, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump((cfg, records), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path(path))
+        except OSError:
+            pass  # read-only directory: just run uncached
+        return cfg, records
+    return cfg, tasks
+
+
+def iter_shards(directory: Path, cache: bool = False) -> Iterator[Mapping[str, Any]]:
+    """Yield tasks from ``directory/*.toml`` in name order.
+
+    Each shard is opened and parsed only when the consumer reaches it,
+    so the first task is available after parsing a single shard.
+    """
+    for shard in sorted(directory.glob("*.toml")):
+        yield from parse(shard, cache)[1]
+
+
+def load(path: str | Path, cache: bool = False) -> tuple[dict, Iterator[Mapping[str, Any]]]:
+    """Return ``(settings, tasks)`` for a config file or a shard directory.
+
+    A config file may point at a shard directory via ``[manifest] shards``
+    (relative to the file); its inline ``[[tasks]]`` run first.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return {}, iter_shards(path, cache)
+    cfg, inline = parse(path, cache)
+    tasks: Iterator[Mapping[str, Any]] = iter(inline)
+    if shards := cfg.get("manifest", {}).get("shards"):
+        tasks = itertools.chain(tasks, iter_shards(path.parent / shards, cache))
+    return cfg, tasks
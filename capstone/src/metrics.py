@@ -0,0 +1,197 @@
+"""Per-type task latency histograms and throughput counters.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import json
+import math
+import time
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Self
+
+# Log-spaced buckets: 4 per power of two from 1 µs up to ~3 hours.
+BASE = 1e-6
+PER_OCTAVE = 4
+BUCKETS = 4 * 34
+BOUNDS = [BASE * 2 ** (i / PER_OCTAVE) for i in range(BUCKETS)]
+
+# Raw samples buffered per histogram before being folded into buckets.
+FLUSH_AT = 1 << 16
+
+
+class Histogram:
+    """Log-bucket histogram filled in bulk from sorted samples."""
+
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (BUCKETS + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def add_sorted(self, data: list[float]) -> None:
+        prev = 0
+        for i, bound in enumerate(BOUNDS):
+            k = bisect_right(data, bound, prev)
+            self.counts[i] += k - prev
+            prev = k
+        self.counts[BUCKETS] += len(data) - prev
+        self.total += math.fsum(data)
+        self.n += len(data)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (≤19% high)."""
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return BOUNDS[min(i, BUCKETS - 1)]
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.n,
+            "mean": self.total / self.n if self.n else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class TypeStats:
+    """Per-type counters plus aligned raw wait/exec samples awaiting ``flush``.
+
+    Sorting and binning happen in bulk, which is far cheaper than binning
+    each sample as it arrives.
+    """
+
+    __slots__ = ("wait", "exec", "latency", "n", "failed", "waits", "execs")
+
+    def __init__(self) -> None:
+        self.wait = Histogram()
+        self.exec = Histogram()
+        self.latency = Histogram()
+        self.n = 0
+        self.failed = 0
+        self.waits = array("d")
+        self.execs = array("d")
+
+    @property
+    def ok(self) -> int:
+        return self.n - self.failed
+
+    def flush(self) -> None:
+        if not self.execs:
+            return
+        waits, execs = self.waits, self.execs
+        self.waits, self.execs = array("d"), array("d")
+        self.latency.add_sorted(sorted(map(float.__add__, waits, execs)))
+        self.wait.add_sorted(sorted(waits))
+        self.exec.add_sorted(sorted(execs))
+
+
+class Metrics:
+    """Aggregates enqueue/start/finish timestamps (``time.perf_counter``) per type.
+
+    Counters are exact. Histograms take the timings of every
+    ``sample_every``-th task of each type, which keeps the overhead on
+    runs of trivial tasks within a couple of percent.
+    """
+
+    def __init__(self, json_path: str | None = None, prom_path: str | None = None,
+                 interval: float | None = None, sample_every: int = 8) -> None:
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.interval = interval
+        self.sample_every = sample_every
+        self.types: dict[str, TypeStats] = {}
+        self.started = time.perf_counter()
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        return cls(cfg.get("json"), cfg.get("prometheus"), cfg.get("interval"), cfg.get("sample_every", 8))
+
+    def record(self, kind: str, enqueued: float, started: float, task: asyncio.Future) -> None:
+        """Account for a finished ``task``; call from its done callback.
+
+        A task that returns ``False`` (a failure absorbed by the isolation
+        policy) counts as failed.
+        """
+        if (stats := self.types.get(kind)) is None:
+            stats = self.types[kind] = TypeStats()
+        stats.n += 1
+        if task.cancelled() or task.exception() is not None or task.result() is False:
+            stats.failed += 1
+        if (stats.n - 1) % self.sample_every == 0:
+            stats.waits.append(started - enqueued)
+            stats.execs.append(time.perf_counter() - started)
+            if len(stats.execs) >= FLUSH_AT:
+                stats.flush()
+
+    def snapshot(self) -> dict:
+        self.flush()
+        elapsed = time.perf_counter() - self.started
+        return {
+            "elapsed_secs": elapsed,
+            "types": {
+                kind: {
+                    "ok": s.ok,
+                    "failed": s.failed,
+                    "tasks_per_sec": s.n / elapsed if elapsed else 0.0,
+                    "wait": s.wait.summary(),
+                    "exec": s.exec.summary(),
+                    "latency": s.latency.summary(),
+                }
+                for kind, s in self.types.items()
+            },
+        }
+
+    def flush(self) -> None:
+        for stats in self.types.values():
+            stats.flush()
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition (one bucket per power of two)."""
+        self.flush()
+        lines = [
+            "# HELP capstone_tasks_total Finished capstone tasks.",
+            "# TYPE capstone_tasks_total counter",
+        ]
+        for kind, s in self.types.items():
+            lines.append(f'capstone_tasks_total{{type="{kind}",outcome="ok"}} {s.ok}')
+            lines.append(f'capstone_tasks_total{{type="{kind}",outcome="failed"}} {s.failed}')
+        for name, help_ in (
+            ("wait", "Time tasks spent queued before starting."),
+            ("exec", "Time tasks spent executing."),
+            ("latency", "Time from enqueue to finish."),
+        ):
+            metric = f"capstone_task_{name}_seconds"
+            lines += [f"# HELP {metric} {help_}", f"# TYPE {metric} histogram"]
+            for kind, s in self.types.items():
+                h: Histogram = getattr(s, name)
+                top = max((i for i, c in enumerate(h.counts) if c), default=0)
+                cumulative = 0
+                for i, c in enumerate(h.counts[: min(top + 1, BUCKETS)]):
+                    cumulative += c
+                    if i % PER_OCTAVE == 0 or i == top:
+                        lines.append(f'{metric}_bucket{{type="{kind}",le="{BOUNDS[min(i, BUCKETS - 1)]:.6g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{type="{kind}",le="+Inf"}} {h.n}')
+                lines.append(f'{metric}_sum{{type="{kind}"}} {h.total}')
+                lines.append(f'{metric}_count{{type="{kind}"}} {h.n}')
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Write the configured exports, or print JSON if none are configured."""
+        if self.json_path:
+            Path(self.json_path).write_text(self.to_json())
+        if self.prom_path:
+            Path(self.prom_path).write_text(self.to_prometheus())
+        if not (self.json_path or self.prom_path):
+            print(self.to_json())
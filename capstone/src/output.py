@@ -0,0 +1,119 @@
+"""Buffered output sink for task output.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import os
+import sys
+from collections.abc import Iterator
+from typing import Self, TextIO
+
+# Admission sequence number of the task whose output is being written.
+current_seq: contextvars.ContextVar[int] = contextvars.ContextVar("current_seq")
+# Extra list receiving the current task's output, if it is being recorded.
+current_capture: contextvars.ContextVar[list[str] | None] = contextvars.ContextVar("current_capture", default=None)
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[list[str]]:
+    """Also collect everything the current task writes into the yielded list."""
+    lines: list[str] = []
+    token = current_capture.set(lines)
+    try:
+        yield lines
+    finally:
+        current_capture.reset(token)
+
+
+class OutputSink:
+    """Batch writes and flush them once ``max_bytes`` or ``interval`` is reached.
+
+    With ``ordered`` set, each task's lines are held back until every task
+    admitted before it has finished, so output follows admission order
+    instead of completion order.
+    """
+
+    def __init__(self, stream: TextIO | None = None, max_bytes: int = 1 << 16,
+                 interval: float = 0.05, ordered: bool = False, owns_stream: bool = False) -> None:
+        self.stream = stream  # None: whatever sys.stdout is at flush time
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.ordered = ordered
+        self._owns_stream = owns_stream
+        self._buf: list[str] = []
+        self._size = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._seq = itertools.count()
+        self._next = 0
+        self._held: dict[int, list[str]] = {}
+        self._done: set[int] = set()
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        """``path`` (appended to) or ``fd`` (e.g. an inherited pipe) selects the target."""
+        kwargs = {
+            "max_bytes": cfg.get("buffer_bytes", 1 << 16),
+            "interval": cfg.get("flush_interval", 0.05),
+            "ordered": cfg.get("ordered", False),
+        }
+        if "path" in cfg:
+            return cls(open(cfg["path"], "a", encoding="utf-8"), owns_stream=True, **kwargs)
+        if "fd" in cfg:
+            return cls(os.fdopen(cfg["fd"], "w", encoding="utf-8", closefd=False), owns_stream=True, **kwargs)
+        return cls(**kwargs)
+
+    def write(self, text: str) -> None:
+        if (lines := current_capture.get()) is not None:
+            lines.append(text)
+        if self.ordered and (seq := current_seq.get(None)) is not None and seq != self._next:
+            self._held.setdefault(seq, []).append(text)
+            return
+        self._append(text)
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[int]:
+        """Claim the next sequence number for the current task (ordered mode)."""
+        seq = next(self._seq)
+        token = current_seq.set(seq)
+        try:
+            yield seq
+        finally:
+            current_seq.reset(token)
+            self._done.add(seq)
+            while self._next in self._done:
+                self._done.remove(self._next)
+                for text in self._held.pop(self._next, ()):
+                    self._append(text)
+                self._next += 1
+
+    def _append(self, text: str) -> None:
+        self._buf.append(text)
+        self._size += len(text)
+        if self._size >= self.max_bytes:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        stream = self.stream or sys.stdout
+        if self._buf:
+            stream.write("".join(self._buf))
+            self._buf.clear()
+            self._size = 0
+        stream.flush()
+
+    def close(self) -> None:
+        for seq in sorted(self._held):
+            for text in self._held[seq]:
+                self._buf.append(text)
+        self._held.clear()
+        self.flush()
+        if self._owns_stream and self.stream is not None:
+            self.stream.close()
@@ -0,0 +1,79 @@
+"""Per-task failure isolation: timeouts, jittered retries and a failure budget.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any, Self
+
+from ratelimit import TokenBucket
+
+
+class FailureBudgetExceeded(Exception):
+    """More tasks failed than the policy allows; the run is aborted."""
+
+
+class Policy:
+    """Run each task in isolation so its failure does not cancel its siblings.
+
+    A task gets ``retries`` extra attempts (per-task ``retries`` overrides),
+    each bounded by ``timeout`` seconds (per-task ``timeout`` overrides).
+    Between attempts it sleeps a random time up to
+    ``min(max_backoff, backoff * 2 ** attempt)`` ("full jitter"). Final
+    failures are collected in ``errors``; once there are more than
+    ``failure_budget`` of them the whole run is aborted.
+
+    A rate-limit ``bucket`` passed to ``run`` is waited on before each
+    attempt, outside its timeout: being throttled is not a failure.
+    """
+
+    def __init__(self, timeout: float | None = None, retries: int = 0, backoff: float = 0.1,
+                 max_backoff: float = 10.0, failure_budget: int | None = None) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_budget = failure_budget
+        self.errors: list[Exception] = []
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        return cls(
+            timeout=cfg.get("timeout"),
+            retries=cfg.get("retries", 0),
+            backoff=cfg.get("backoff", 0.1),
+            max_backoff=cfg.get("max_backoff", 10.0),
+            failure_budget=cfg.get("failure_budget"),
+        )
+
+    async def run(self, task: Mapping[str, Any], attempt: Callable[[], Awaitable[object]],
+                  bucket: TokenBucket | None = None) -> bool:
+        """Call ``attempt()`` until it succeeds or retries run out; report success."""
+        timeout = task.get("timeout", self.timeout)
+        retries = task.get("retries", self.retries)
+        n = 0
+        while True:
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                async with asyncio.timeout(timeout):
+                    await attempt()
+                return True
+            except Exception as e:
+                if n < retries:
+                    await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** n)))
+                    n += 1
+                    continue
+                e.add_note(f"task {task.get('id', task)!r} failed after {n + 1} attempt(s)")
+                self.errors.append(e)
+                if self.failure_budget is not None and len(self.errors) > self.failure_budget:
+                    raise FailureBudgetExceeded(
+                        f"{len(self.errors)} tasks failed, budget is {self.failure_budget}"
+                    ) from ExceptionGroup("failed tasks", self.errors)
+                return False
+
+    def raise_errors(self) -> None:
+        if self.errors:
+            raise ExceptionGroup(f"{len(self.errors)} task(s) failed", self.errors)
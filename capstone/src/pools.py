@@ -0,0 +1,169 @@
+"""Executor pools for CPU-bound task types.
+
+Run with Python >=3.11 (``backend = "interpreter"`` needs >=3.14,
+``backend = "thread"`` only scales on a free-threaded build)
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import itertools
+import os
+import sys
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable
+from typing import Any, Self, cast
+
+BACKENDS = ("auto", "process", "interpreter", "thread")
+
+
+def gil_enabled() -> bool:
+    """False only on a free-threaded (3.13t/3.14t) build running without the GIL."""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_enabled() if is_enabled is not None else True
+
+
+def default_backend() -> str:
+    return "process" if gil_enabled() else "thread"
+
+
+@functools.cache
+def resolve(ref: str) -> Callable[..., Any]:
+    """Resolve ``"package.module:qualname"`` to the callable it names."""
+    module, _, qualname = ref.partition(":")
+    obj: Any = importlib.import_module(module)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return cast(Callable[..., Any], obj)
+
+
+def apply_chunk(fn: Callable[..., Any], chunk: list) -> list:
+    return [fn(item) for item in chunk]
+
+
+class WorkStealingExecutor(concurrent.futures.Executor):
+    """Thread pool with one deque per worker; idle workers steal from the others.
+
+    Work submitted from a worker thread lands on that worker's own deque, so
+    nested fan-out stays local until someone else runs dry. Owners take from
+    the head (FIFO) and thieves from the tail.
+    """
+
+    def __init__(self, max_workers: int | None = None, thread_name_prefix: str = "steal") -> None:
+        n = max_workers or os.cpu_count() or 1
+        self._queues: list[deque[tuple]] = [deque() for _ in range(n)]
+        self._items = threading.Semaphore(0)
+        self._rr = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._worker, args=(i,), name=f"{thread_name_prefix}-{i}", daemon=True)
+            for i in range(n)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn, /, *args, **kwargs) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            index = getattr(self._local, "index", None)
+            if index is None:
+                index = next(self._rr) % len(self._queues)
+            self._queues[index].append((future, fn, args, kwargs))
+        self._items.release()
+        return future
+
+    def _take(self, index: int) -> tuple | None:
+        n = len(self._queues)
+        while True:
+            try:
+                return self._queues[index].popleft()
+            except IndexError:
+                pass
+            for k in range(1, n):
+                try:
+                    return self._queues[(index + k) % n].pop()
+                except IndexError:
+                    pass
+            if self._shutdown:
+                return None
+
+    def _worker(self, index: int) -> None:
+        self._local.index = index
+        while True:
+            self._items.acquire()
+            if (item := self._take(index)) is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                for q in self._queues:
+                    while q:
+                        q.popleft()[0].cancel()
+        for _ in self._threads:
+            self._items.release()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+
+class CpuPool:
+    """Lazily created executor that runs CPU work off the event loop."""
+
+    def __init__(self, backend: str = "auto", workers: int | None = None, chunksize: int = 1) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown cpu backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = default_backend() if backend == "auto" else backend
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._executor: concurrent.futures.Executor | None = None
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        return cls(cfg.get("backend", "auto"), cfg.get("workers"), cfg.get("chunksize", 1))
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.backend == "interpreter":
+                if sys.version_info < (3, 14):
+                    raise RuntimeError("cpu backend 'interpreter' needs Python >= 3.14")
+                # Sub-interpreters start with a fresh sys.path; give them ours so
+                # this module and "module:qualname" task callables import there too.
+                self._executor = concurrent.futures.InterpreterPoolExecutor(
+                    self.workers, initializer=exec, initargs=(f"import sys; sys.path[:] = {sys.path!r}",))
+            elif self.backend == "thread":
+                self._executor = WorkStealingExecutor(self.workers)
+            else:
+                self._executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+        return self._executor
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def map(self, fn: Callable[..., Any], items: Iterable, chunksize: int | None = None) -> list:
+        """Apply ``fn`` to every item, submitting ``chunksize`` items per job; keeps order."""
+        size = chunksize or self.chunksize
+        it = iter(items)
+        chunks = iter(lambda: list(itertools.islice(it, size)), [])
+        parts = await asyncio.gather(*(self.call(apply_chunk, fn, chunk) for chunk in chunks))
+        return [r for part in parts for r in part]
+
+    def shutdown(self, cancel: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=cancel)
+            self._executor = None
@@ -0,0 +1,41 @@
+"""Async token buckets for task types that call rate-limited services.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+from typing import Self
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second with bursts of up to ``burst``.
+
+    Waiters reserve their token up front (the balance may go negative), so
+    they are released one every ``1 / rate`` seconds in arrival order
+    instead of all waking together and racing for the next token.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._stamp: float | None = None
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        return cls(cfg["rate"], cfg.get("burst", 1))
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        if self._stamp is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            try:
+                await asyncio.sleep(-self._tokens / self.rate)
+            except asyncio.CancelledError:
+                self._tokens += 1  # hand the reserved slot to the next caller
+                raise
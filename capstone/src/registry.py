@@ -0,0 +1,154 @@
+"""Task handler registry keyed by ``type``.
+
+Handlers are registered with ``@register`` or through the
+``capstone.handlers`` entry-point group, and tasks are checked against the
+handler's declared fields once, when they are loaded.
+
+Run with Python >=3.11
+"""
+
+import sys
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any
+
+ENTRY_POINT_GROUP = "capstone.handlers"
+
+HandlerFn = Callable[[Any, Mapping[str, Any]], Awaitable[Any]]
+
+
+class TaskError(ValueError):
+    """A task table does not match any registered handler."""
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerSpec:
+    kind: str
+    fn: HandlerFn
+    fields: dict[str, Any]
+
+
+HANDLERS: dict[str, HandlerSpec] = {}
+
+# Optional keys any task may carry, read by the Runner rather than its handler.
+COMMON_FIELDS: dict[str, Any] = {
+    "id": str,
+    "priority": (int, float),
+    "cost": (int, float),
+    "timeout": (int, float),
+    "retries": int,
+}
+
+
+def register(kind: str, **fields: Any) -> Callable[[HandlerFn], HandlerFn]:
+    """Register ``fn(runner, task)`` for tasks of ``type = kind``.
+
+    ``fields`` maps each required key to the type(s) accepted by ``isinstance``.
+    """
+    def deco(fn: HandlerFn) -> HandlerFn:
+        HANDLERS[kind] = HandlerSpec(kind, fn, fields)
+        return fn
+    return deco
+
+
+def load_entry_points() -> None:
+    """Import handlers published by installed distributions.
+
+    An entry point may register itself via ``@register`` on import; a bare
+    coroutine function is registered under the entry-point name.
+    """
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        fn = ep.load()
+        if ep.name not in HANDLERS and callable(fn):
+            register(ep.name, **getattr(fn, "task_fields", {}))(fn)
+
+
+def signature() -> tuple:
+    """The registered task schema; validation results depend on nothing else."""
+    return tuple(sorted((kind, repr(spec.fields)) for kind, spec in HANDLERS.items()))
+
+
+def validate(task: Mapping[str, Any]) -> HandlerSpec:
+    kind = task.get("type")
+    if not isinstance(kind, str) or (spec := HANDLERS.get(kind)) is None:
+        raise TaskError(f"unknown task type: {kind!r}")
+    for key, expected in spec.fields.items():
+        if key not in task:
+            raise TaskError(f"{spec.kind} task missing {key!r}")
+        if not isinstance(task[key], expected):
+            raise TaskError(f"{spec.kind} task field {key!r} has type {type(task[key]).__name__}")
+    for key, expected in COMMON_FIELDS.items():
+        if key in task and not isinstance(task[key], expected):
+            raise TaskError(f"{spec.kind} task field {key!r} has type {type(task[key]).__name__}")
+    return spec
+
+
+class TaskRecord(Mapping):
+    """Read-only task table stored as two tuples instead of a dict.
+
+    Tasks with the same keys in the same order share one interned key
+    tuple, so a record costs one small object plus its values where a
+    parsed dict also carries a hash table and its own copy of every key.
+    """
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: tuple[str, ...], values: tuple) -> None:
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        keys = self._keys
+        return self._values[keys.index(key)] if key in keys else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._keys, self._values)))
+
+    def __reduce__(self) -> tuple:
+        return TaskRecord, (self._keys, self._values)
+
+
+_LAYOUTS: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def compact(task: Mapping[str, Any]) -> TaskRecord:
+    """Freeze a parsed task into a TaskRecord with shared keys and type name."""
+    keys = tuple(task)
+    keys = _LAYOUTS.setdefault(keys, tuple(map(sys.intern, keys)))
+    values = tuple(sys.intern(v) if k == "type" else v for k, v in task.items())
+    return TaskRecord(keys, values)
+
+
+def validated(tasks: Iterable[Mapping[str, Any]], dag: bool = True) -> Iterator[TaskRecord]:
+    """Yield valid tasks as compact records; report and skip the rest.
+
+    Records come only from this function (or a cache of its output), so
+    they are passed through as already valid. With ``dag=False`` tasks
+    declaring ``after`` are rejected too, since nothing would honour them.
+    """
+    for task in tasks:
+        try:
+            if not isinstance(task, TaskRecord):
+                validate(task)
+            if not dag and "after" in task:
+                raise TaskError("tasks with 'after' need [scheduler] dag = true")
+        except TaskError as e:
+            print("invalid task", task, f"({e})")
+            continue
+        yield task if isinstance(task, TaskRecord) else compact(task)
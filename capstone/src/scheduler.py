@@ -0,0 +1,177 @@
+"""Bounded, priority-aware admission of Runner tasks.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Coroutine, Iterable, Iterator, Mapping
+from typing import Any, Self
+
+from metrics import Metrics
+
+Handler = Callable[[Mapping[str, Any]], Coroutine[Any, Any, bool]]
+
+# Tasks pulled from the source per admission round when no window is set.
+FILL_BATCH = 1024
+
+
+class Scheduler:
+    """Admit tasks into a TaskGroup only while concurrency slots are free.
+
+    ``limit`` caps running tasks globally and ``type_limits`` per ``type``.
+    At most ``window`` tasks are pulled from the source ahead of execution,
+    so a huge manifest never turns into a huge number of coroutines.
+    Among pending tasks the highest ``priority`` runs first (FIFO on ties).
+
+    Pending tasks are kept in one heap per type. ``_heads`` lists the best
+    pending task of each type that has a free slot, so admission never
+    scans tasks whose type is at its cap.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = None,
+        type_limits: dict[str, int] | None = None,
+        window: int | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.limit = limit
+        self.type_limits = type_limits or {}
+        if window is None and (limit or self.type_limits):
+            window = 4 * limit if limit else 1024
+        self.window = window
+        self.metrics = metrics
+        self.running = 0
+        self.running_by_type: dict[str, int] = {}
+        self._queues: dict[str, list[tuple[float, int, float, Mapping[str, Any]]]] = {}
+        self._heads: list[tuple[float, int, str]] = []
+        self._listed: dict[str, tuple[float, int]] = {}  # the live _heads entry per type
+        self._pending = 0
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._open = False
+        self._active: dict[asyncio.Task, Mapping[str, Any]] | None = None
+
+    @classmethod
+    def from_config(cls, cfg: dict, metrics: Metrics | None = None) -> Self:
+        return cls(
+            limit=cfg.get("max_concurrency"),
+            type_limits=dict(cfg.get("type_limits", {})),
+            window=cfg.get("window"),
+            metrics=metrics,
+        )
+
+    def push(self, task: Mapping[str, Any], priority: float | None = None) -> None:
+        if priority is None:
+            priority = task.get("priority", 0)
+        entry = (-priority, next(self._seq), time.perf_counter(), task)
+        kind = task.get("type", "")
+        queue = self._queues.setdefault(kind, [])
+        heapq.heappush(queue, entry)
+        self._pending += 1
+        if queue[0] is entry:
+            self._list(kind)
+        self._wakeup.set()
+
+    def keep_open(self) -> None:
+        """Keep ``run`` waiting for ``push`` once its source is exhausted,
+        and track running tasks so ``cancel`` can reach them."""
+        self._open = True
+        if self._active is None:
+            self._active = {}
+
+    def cancel(self, ids: set[str]) -> int:
+        """Drop pending tasks, and cancel running ones, whose ``id`` is in ``ids``."""
+        n = 0
+        for kind, queue in self._queues.items():
+            kept = [entry for entry in queue if entry[3].get("id") not in ids]
+            if len(kept) < len(queue):
+                n += len(queue) - len(kept)
+                heapq.heapify(kept)
+                queue[:] = kept
+                self._listed.pop(kind, None)  # its head may be gone
+                self._list(kind)
+        self._pending -= n
+        for t, task in (self._active or {}).items():
+            if task.get("id") in ids and t.cancel():
+                n += 1
+        return n
+
+    async def run(self, tasks: Iterable[Mapping[str, Any]], handler: Handler) -> None:
+        source: Iterator[Mapping[str, Any]] | None = iter(tasks)
+        async with asyncio.TaskGroup() as tg:
+            while True:
+                source = self._fill(source)
+                while (entry := self._next_ready()) is not None:
+                    self._start(tg, entry, handler)
+                if source is not None and self._has_room():
+                    # Let admitted tasks start before pulling (and parsing) more.
+                    await asyncio.sleep(0)
+                    continue
+                if source is None and not self._pending and not self.running and not self._open:
+                    break
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+    def _has_room(self) -> bool:
+        return self.window is None or self._pending < self.window
+
+    def _fill(self, source: Iterator[Mapping[str, Any]] | None) -> Iterator[Mapping[str, Any]] | None:
+        for _ in range(FILL_BATCH):
+            if source is None or not self._has_room():
+                break
+            try:
+                self.push(next(source))
+            except StopIteration:
+                return None
+        return source
+
+    def _has_slot(self, kind: str) -> bool:
+        cap = self.type_limits.get(kind)
+        return cap is None or self.running_by_type.get(kind, 0) < cap
+
+    def _list(self, kind: str) -> None:
+        """Offer ``kind``'s best pending task for admission if the type has a free slot."""
+        queue = self._queues.get(kind)
+        if queue and self._has_slot(kind):
+            key = queue[0][:2]
+            if self._listed.get(kind) != key:
+                self._listed[kind] = key
+                heapq.heappush(self._heads, (*key, kind))
+
+    def _next_ready(self) -> tuple | None:
+        if self.limit is not None and self.running >= self.limit:
+            return None
+        while self._heads:
+            neg_priority, seq, kind = heapq.heappop(self._heads)
+            if self._listed.get(kind) != (neg_priority, seq):
+                continue  # superseded by a better task of the same type
+            del self._listed[kind]
+            self._pending -= 1
+            return heapq.heappop(self._queues[kind])
+        return None
+
+    def _start(self, tg: asyncio.TaskGroup, entry: tuple, handler: Handler) -> None:
+        task = entry[3]
+        kind = task.get("type", "")
+        self.running += 1
+        self.running_by_type[kind] = self.running_by_type.get(kind, 0) + 1
+        started = time.perf_counter()
+        t = tg.create_task(handler(task))
+        if self._active is not None:
+            self._active[t] = task
+        t.add_done_callback(lambda t: self._release(kind, entry[2], started, t))
+        self._list(kind)
+
+    def _release(self, kind: str, enqueued: float, started: float, t: asyncio.Task) -> None:
+        if self._active is not None:
+            del self._active[t]
+        if self.metrics is not None:
+            self.metrics.record(kind, enqueued, started, t)
+        self.running -= 1
+        self.running_by_type[kind] -= 1
+        self._list(kind)
+        self._wakeup.set()
@@ -0,0 +1,180 @@
+"""SQLite-backed task queue shared by a coordinator and Runner workers.
+
+Workers lease batches of tasks; a lease that is not renewed before it
+expires (the worker died or hung) puts its tasks back up for grabs.
+SQLite in WAL mode serves any number of processes on one host; several
+hosts can share it only through a filesystem with working POSIX locks.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    body TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, seq);
+"""
+
+
+# Tasks leased at a time when the scheduler has neither a window nor a limit.
+LEASE_BATCH = 256
+
+
+class TaskQueue:
+    """Task rows move ``queued -> leased -> done``, or ``failed`` after
+    ``max_attempts`` attempts that failed or whose lease expired."""
+
+    def __init__(self, path: str | os.PathLike, lease_secs: float = 30.0, max_attempts: int = 3) -> None:
+        self.lease_secs = lease_secs
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def enqueue(self, tasks: Iterable[Mapping[str, Any]], batch: int = 10_000) -> int:
+        """Insert tasks not already queued (by ``id``); return how many were new."""
+        added = 0
+        it = iter(tasks)
+        while rows := [(t["id"], json.dumps(dict(t))) for t in itertools.islice(it, batch)]:
+            with self.db:
+                self.db.execute("BEGIN IMMEDIATE")
+                before = self.db.total_changes
+                self.db.executemany("INSERT OR IGNORE INTO tasks (id, body) VALUES (?, ?)", rows)
+                added += self.db.total_changes - before
+        return added
+
+    def lease(self, worker: str, n: int) -> list[dict]:
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute(
+                "UPDATE tasks SET state = 'failed' WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            rows = self.db.execute(
+                """UPDATE tasks SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1
+                   WHERE seq IN (SELECT seq FROM tasks
+                                 WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?)
+                                 ORDER BY seq LIMIT ?)
+                   RETURNING body""",
+                (worker, now + self.lease_secs, now, n),
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def renew(self, worker: str) -> None:
+        with self.db:
+            self.db.execute(
+                "UPDATE tasks SET lease_until = ? WHERE worker = ? AND state = 'leased'",
+                (time.time() + self.lease_secs, worker),
+            )
+
+    def complete(self, worker: str, ids: list[str]) -> None:
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany(
+                "UPDATE tasks SET state = 'done' WHERE id = ? AND worker = ? AND state = 'leased'",
+                [(i, worker) for i in ids],
+            )
+
+    def fail(self, worker: str, ids: list[str]) -> None:
+        """Give failed tasks back to the queue, or mark them ``failed`` when out of attempts."""
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany(
+                """UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                                    worker = NULL, lease_until = NULL
+                   WHERE id = ? AND worker = ? AND state = 'leased'""",
+                [(self.max_attempts, i, worker) for i in ids],
+            )
+
+    def counts(self) -> dict[str, int]:
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"))
+
+    def unfinished(self) -> int:
+        counts = self.counts()
+        return counts.get("queued", 0) + counts.get("leased", 0)
+
+
+class WorkerSession:
+    """One worker's view of the queue, shaped for a Runner.
+
+    ``tasks()`` is the Runner's task source, and the session doubles as
+    its completion journal: finished ids are acknowledged in batches while a
+    heartbeat keeps the worker's leases from expiring. Failed ids go back to
+    the queue at once, so another attempt need not wait for the lease.
+    """
+
+    def __init__(self, queue: TaskQueue, worker: str | None = None, batch: int = LEASE_BATCH,
+                 interval: float = 0.5) -> None:
+        self.queue = queue
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch = batch
+        self.interval = interval
+        self.done: set[str] = set()
+        self._ids: list[str] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._renew_timer: asyncio.TimerHandle | None = None
+
+    def tasks(self) -> Iterator[dict]:
+        """Lease and yield tasks until none are available right now."""
+        while tasks := self.queue.lease(self.worker, self.batch):
+            if self._renew_timer is None:
+                self._schedule_renew()
+            yield from tasks
+
+    def record(self, task_id: str) -> None:
+        self._ids.append(task_id)
+        if len(self._ids) >= self.batch:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+    def fail(self, task_id: str) -> None:
+        self.queue.fail(self.worker, [task_id])
+
+    def flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._ids:
+            self.queue.complete(self.worker, self._ids)
+            self._ids = []
+
+    def _schedule_renew(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._renew_timer = loop.call_later(self.queue.lease_secs / 3, self._renew)
+
+    def _renew(self) -> None:
+        self.queue.renew(self.worker)
+        self._schedule_renew()
+
+    def close(self) -> None:
+        if self._renew_timer is not None:
+            self._renew_timer.cancel()
+            self._renew_timer = None
+        self.flush()
+
+
+def spawn_workers(n: int, config: str, queue_path: str) -> list[subprocess.Popen]:
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    cmd = [sys.executable, main, config, "--queue", queue_path, "--role", "worker"]
+    return [subprocess.Popen(cmd) for _ in range(n)]
@@ -0,0 +1,156 @@
+"""Hierarchical timing wheel for large numbers of sleeping tasks.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import math
+from typing import Self
+
+
+class TimingWheel:
+    """Coalesce delays into ticks of ``resolution`` seconds.
+
+    The wheel keeps a single loop timer, set for the next tick that has a
+    bucket to fire or cascade, instead of one heap entry per sleeper. Level
+    ``L`` has ``slots`` buckets that are ``slots ** L`` ticks wide; far
+    deadlines cascade down a level each time their bucket comes round.
+    Sleepers wake no earlier than requested and at most ``resolution``
+    seconds late (plus event-loop lag). A cancelled sleeper is dropped from
+    its bucket straight away.
+    """
+
+    def __init__(self, resolution: float = 0.01, slots: int = 256, levels: int = 4) -> None:
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        # Buckets map future -> target tick; _bucket_of finds a future's bucket
+        # so a cancelled sleeper can be dropped at once.
+        self._wheels: list[list[dict]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow: dict[asyncio.Future, int] = {}
+        self._bucket_of: dict[asyncio.Future, dict] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._origin = 0.0
+        self._tick = 0
+        self._count = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_tick = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Self:
+        return cls(cfg.get("resolution", 0.01), cfg.get("slots", 256), cfg.get("levels", 4))
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def sleep(self, delay: float) -> None:
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        await self.wait(delay)
+
+    def wait(self, delay: float) -> asyncio.Future:
+        """Return a future resolved once ``delay`` seconds have passed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._origin, self._tick = loop, loop.time(), 0
+        now = loop.time()
+        if not self._count:
+            # Idle: jump straight to the present instead of replaying empty ticks.
+            self._tick = int((now - self._origin) / self.resolution)
+        fut = loop.create_future()
+        target = max(math.ceil((now + delay - self._origin) / self.resolution), self._tick + 1)
+        event = self._place(target, fut)
+        self._count += 1
+        fut.add_done_callback(self._forget)
+        if self._timer is None or event < self._timer_tick:
+            self._set_timer(event)
+        return fut
+
+    def _place(self, target: int, fut: asyncio.Future) -> int:
+        """File ``fut`` under ``target``; return the tick at which the wheel must look at it."""
+        delta = target - self._tick
+        width = 1
+        for wheel in self._wheels:
+            if delta < width * self.slots:
+                bucket = wheel[(target // width) % self.slots]
+                bucket[fut] = target
+                self._bucket_of[fut] = bucket
+                return target // width * width  # the tick it fires or cascades down
+            width *= self.slots
+        self._overflow[fut] = target
+        self._bucket_of[fut] = self._overflow
+        return (self._tick // width + 1) * width
+
+    def _forget(self, fut: asyncio.Future) -> None:
+        """Done callback: drop a sleeper that was cancelled before its tick."""
+        bucket = self._bucket_of.pop(fut, None)
+        if bucket is None:
+            return  # fired normally
+        del bucket[fut]
+        self._count -= 1
+        if not self._count and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _next_event(self) -> int | None:
+        """The first tick after the current one with a bucket to fire or cascade."""
+        best = None
+        width = 1
+        for wheel in self._wheels:
+            base = self._tick // width
+            for k in range(1, self.slots + 1):
+                if best is not None and (base + k) * width >= best:
+                    break
+                if wheel[(base + k) % self.slots]:
+                    best = (base + k) * width
+                    break
+            width *= self.slots
+        if self._overflow:
+            boundary = (self._tick // width + 1) * width
+            best = boundary if best is None else min(best, boundary)
+        return best
+
+    def _set_timer(self, tick: int) -> None:
+        assert self._loop is not None  # set by the first wait()
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_tick = tick
+        self._timer = self._loop.call_at(self._origin + tick * self.resolution, self._run)
+
+    def _run(self) -> None:
+        assert self._loop is not None
+        self._timer = None
+        # A hair of tolerance so float rounding cannot leave the due tick unprocessed.
+        due = math.floor((self._loop.time() - self._origin) / self.resolution + 1e-6)
+        while self._count and (tick := self._next_event()) is not None and tick <= due:
+            self._tick = tick
+            self._advance(tick)
+        if self._count and (tick := self._next_event()) is not None:
+            self._set_timer(tick)
+
+    def _advance(self, tick: int) -> None:
+        width = self.slots ** self.levels
+        if tick % width == 0 and self._overflow:
+            pending, self._overflow = self._overflow, {}
+            for fut, target in pending.items():
+                self._place(target, fut)
+        for level in range(self.levels - 1, 0, -1):
+            width = self.slots ** level
+            if tick % width == 0:
+                bucket = self._wheels[level][(tick // width) % self.slots]
+                if bucket:
+                    self._wheels[level][(tick // width) % self.slots] = {}
+                    for fut, target in bucket.items():
+                        self._place(target, fut)
+        bucket = self._wheels[0][tick % self.slots]
+        if bucket:
+            self._wheels[0][tick % self.slots] = {}
+            for fut in bucket:
+                if fut.done():
+                    continue  # cancelled this loop iteration; _forget accounts for it
+                del self._bucket_of[fut]
+                self._count -= 1
+                fut.set_result(None)
@@ -0,0 +1,111 @@
+"""Reload the manifest when its files change and schedule only the delta.
+
+Run with Python >=3.11
+"""
+
+import asyncio
+import sys
+import tomllib
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+import manifest
+import registry
+from scheduler import Scheduler
+
+
+def sources(path: Path) -> list[Path]:
+    """The files a manifest is read from: the config and/or its shards."""
+    if path.is_dir():
+        return sorted(path.glob("*.toml"))
+    files = [path]
+    try:
+        with open(path, "rb") as f:
+            shards = tomllib.load(f).get("manifest", {}).get("shards")
+    except (OSError, tomllib.TOMLDecodeError):
+        return files
+    if shards:
+        files += sorted((path.parent / shards).glob("*.toml"))
+    return files
+
+
+def fingerprint(path: Path) -> tuple:
+    """``(name, mtime_ns, size)`` for each source file; any edit changes it."""
+    stamps = []
+    for file in sources(path):
+        try:
+            st = file.stat()
+        except FileNotFoundError:
+            continue
+        stamps.append((str(file), st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def diff(old: Mapping[str, Mapping[str, Any]],
+         new: Mapping[str, Mapping[str, Any]]) -> tuple[list[str], list[str], list[str]]:
+    """Return ``(added, removed, changed)`` task ids between two manifests."""
+    added = [i for i in new if i not in old]
+    removed = [i for i in old if i not in new]
+    changed = [i for i in new if i in old and new[i] != old[i]]
+    return added, removed, changed
+
+
+class Watcher:
+    """Poll the manifest's files and apply edits to a running scheduler.
+
+    Tasks are matched by ``id``: added tasks are pushed, removed ones are
+    dropped if pending or cancelled if running, and changed ones are
+    cancelled and pushed again in their new form. Unchanged tasks are left
+    alone, whether they are waiting, running or finished. Positional ids
+    (``file#index``) shift when tasks are inserted above them, so give
+    tasks explicit ids when editing a manifest under watch.
+    """
+
+    def __init__(self, path: str | Path, interval: float | None = None, cache: bool = False) -> None:
+        self.path = Path(path)
+        self.cache = cache
+        self.stamp = fingerprint(self.path)
+        self.cfg, self.tasks = self.load()
+        self.interval = interval or self.cfg.get("watch", {}).get("interval", 1.0)
+
+    def load(self) -> tuple[dict, dict[str, Mapping[str, Any]]]:
+        cfg, tasks = manifest.load(self.path, self.cache)
+        return cfg, {task["id"]: task for task in tasks}
+
+    def current(self, tasks: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        """Yield tasks unless a reload has removed or replaced them since."""
+        for task in tasks:
+            if self.tasks.get(task["id"]) is task:
+                yield task
+
+    async def run(self, scheduler: Scheduler) -> None:
+        """Apply changes to ``scheduler`` every ``interval`` seconds, forever.
+
+        The scheduler must have been told to ``keep_open()``.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            if (stamp := fingerprint(self.path)) != self.stamp:
+                self.stamp = stamp
+                self.reload(scheduler)
+
+    def reload(self, scheduler: Scheduler) -> None:
+        try:
+            cfg, tasks = self.load()
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            print(f"watch: keeping current tasks, reload failed: {e}", file=sys.stderr)
+            return
+        added, removed, changed = diff(self.tasks, tasks)
+        cancelled = scheduler.cancel({*removed, *changed})
+        for task in registry.validated((tasks[i] for i in added + changed), dag=False):
+            scheduler.push(task)
+        if cfg != self.cfg:
+            print("watch: settings changed; restart to apply them", file=sys.stderr)
+        # Keep the old objects for unchanged tasks: current() matches by identity,
+        # and those not yet read from the source must still pass it.
+        fresh = {*added, *changed}
+        self.cfg = cfg
+        self.tasks = {i: task if i in fresh else self.tasks[i] for i, task in tasks.items()}
+        print(f"watch: {len(added)} added, {len(removed)} removed, {len(changed)} changed "
+              f"({cancelled} cancelled)", file=sys.stderr)
@@ -0,0 +1,39 @@
+"""Regression tests for the timing wheel.
+
+Run with Python >=3.11:
+    python -m unittest discover capstone/tests
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from timewheel import TimingWheel  # noqa: E402
+
+
+class CancelAtFiringTick(unittest.TestCase):
+    def test_bucket_mates_still_wake(self) -> None:
+        """A sleeper cancelled in the iteration its tick fires must not strand the rest."""
+        async def main() -> None:
+            wheel = TimingWheel(resolution=0.01)
+            loop = asyncio.get_running_loop()
+            when = loop.time() + 0.05
+            a = asyncio.ensure_future(wheel.wait(0.05))
+            b = asyncio.ensure_future(wheel.wait(0.05))
+            loop.call_at(when - 0.03, time.sleep, 0.08)  # block until both below are due
+            loop.call_at(when - 0.002, a.cancel)  # runs just before the wheel fires a's tick
+            await asyncio.wait_for(b, 1.0)
+            self.assertTrue(a.cancelled())
+            await asyncio.sleep(0)  # let a's done callback run
+            self.assertEqual(len(wheel), 0)
+            self.assertIsNone(wheel._timer)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,92 +1,194 @@
 """
 检查 Python 版本和 GIL 状态
 
-用于确认是否使用了 Python 3.14t (free-threading) 版本
+用于确认是否使用了 Python 3.14t (free-threading) 版本。
+
+也可作为模块导入：``fingerprint()`` 返回结构化的运行环境信息
+（构建选项、GIL、JIT、CPU 数与亲和性、调频策略、负载），
+基准测试把它写入输出，便于跨机器、跨解释器比较结果；
+``print_environment()`` 打印其一行摘要，``git_rev()`` 返回被测代码的提交号。
+所有基准脚本都从这里导入这三者，不各自实现。
 """
 
+from __future__ import annotations  # 本脚本需要在旧版本 Python 上也能运行
+
+import json
+import os
+import platform
+import subprocess
 import sys
 import sysconfig
+from pathlib import Path
+
+
+def gil_enabled() -> bool:
+    """3.13 之前没有 ``sys._is_gil_enabled``，GIL 总是启用。"""
+    return sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+
+
+def jit_state(config_args: str) -> dict:
+    """JIT 是否编译进解释器（available）以及当前是否启用（enabled，未知为 None）。"""
+    jit = getattr(sys, "_jit", None)  # 3.14+
+    if jit is not None:
+        return {"available": jit.is_available(), "enabled": jit.is_enabled()}
+    available = "--enable-experimental-jit" in config_args
+    return {"available": available, "enabled": None if available else False}
+
+
+def cpu_governor() -> str | None:
+    """Linux cpufreq 调频策略（如 performance / powersave），其他系统为 None。"""
+    try:
+        return Path("/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor").read_text().strip()
+    except OSError:
+        return None
+
+
+def fingerprint() -> dict:
+    """返回可 JSON 序列化的运行环境指纹。"""
+    config_args = sysconfig.get_config_var("CONFIG_ARGS") or ""
+    affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "executable": sys.executable,
+        "compiler": platform.python_compiler(),
+        "build": {
+            "Py_GIL_DISABLED": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+            "abiflags": sysconfig.get_config_var("abiflags") or "",
+            "debug": bool(sysconfig.get_config_var("Py_DEBUG")),
+            "pgo": "--enable-optimizations" in config_args,
+            "lto": "--with-lto" in config_args,
+            "config_args": config_args,
+        },
+        "gil_enabled": gil_enabled(),
+        "jit": jit_state(config_args),
+        "cpu": {
+            "count": os.cpu_count(),
+            "affinity": affinity,
+            "governor": cpu_governor(),
+            "machine": platform.machine(),
+        },
+        "platform": platform.platform(),
+        "loadavg": list(os.getloadavg()) if hasattr(os, "getloadavg") else None,
+    }
 
-print("=" * 60)
-print("Python 版本信息检查")
-print("=" * 60)
 
-# 基本版本信息
-print(f"\nPython 版本: {sys.version}")
-print(f"版本号: {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
-print(f"可执行文件: {sys.executable}")
+def summary(fp: dict) -> str:
+    """一行文字摘要，供只打印表格的基准测试放在输出开头。"""
+    cpu = fp["cpu"]
+    cpus = len(cpu["affinity"]) if cpu["affinity"] is not None else cpu["count"]
+    load = f"{fp['loadavg'][0]:.2f}" if fp["loadavg"] is not None else "n/a"
+    return (f"{fp['implementation']} {fp['python']}{fp['build']['abiflags']}, "
+            f"GIL {'on' if fp['gil_enabled'] else 'off'}, JIT {'on' if fp['jit']['enabled'] else 'off'}, "
+            f"{cpus}/{cpu['count']} CPUs, governor {cpu['governor'] or 'n/a'}, load {load}")
 
-# 检查是否为 free-threading 构建
-print("\n" + "=" * 60)
-print("GIL 状态检查")
-print("=" * 60)
 
-# Python 3.13+ 可以通过 sys._is_gil_enabled() 检查
-if hasattr(sys, '_is_gil_enabled'):
+def print_environment() -> None:
+    """基准输出的第一行：运行所用的解释器与机器。"""
+    print(f"# {summary(fingerprint())}")
+
+
+def git_rev() -> str | None:
+    """本仓库当前检出的短提交号；不在 git 工作树中（或没有 git）时为 None。"""
     try:
-        gil_enabled = sys._is_gil_enabled()
-        if gil_enabled:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    fp = fingerprint()
+
+    print("=" * 60)
+    print("Python 版本信息检查")
+    print("=" * 60)
+
+    # 基本版本信息
+    print(f"\nPython 版本: {sys.version}")
+    print(f"版本号: {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
+    print(f"可执行文件: {sys.executable}")
+
+    # 检查是否为 free-threading 构建
+    print("\n" + "=" * 60)
+    print("GIL 状态检查")
+    print("=" * 60)
+
+    # Python 3.13+ 可以通过 sys._is_gil_enabled() 检查
+    if hasattr(sys, '_is_gil_enabled'):
+        if fp["gil_enabled"]:
             print("❌ GIL 状态: 已启用 (标准版本)")
             print("   这是带 GIL 的标准 Python")
         else:
             print("✅ GIL 状态: 已禁用 (free-threading 版本)")
             print("   🎉 这是 Python 3.14t - 支持真多线程!")
-    except Exception as e:
-        print(f"⚠️  无法检测 GIL 状态: {e}")
-else:
-    print("⚠️  此版本不支持 GIL 状态检查")
-    print("   (需要 Python 3.13+)")
-
-# 检查构建配置
-print("\n" + "=" * 60)
-print("构建配置")
-print("=" * 60)
-
-config_vars = sysconfig.get_config_vars()
-
-# 检查是否包含 free-threading 相关配置
-if 'Py_GIL_DISABLED' in config_vars:
-    print(f"✅ Py_GIL_DISABLED: {config_vars['Py_GIL_DISABLED']}")
-    print("   这是 free-threading 构建")
-else:
-    print("❌ 未找到 Py_GIL_DISABLED 配置")
-    print("   这可能是标准 GIL 构建")
-
-# 检查 abiflags
-abiflags = sysconfig.get_config_var('abiflags') or ''
-print(f"\nABI Flags: {abiflags if abiflags else '(无)'}")
-if 't' in abiflags:
-    print("✅ 包含 't' 标志 - free-threading 版本")
-else:
-    print("❌ 不包含 't' 标志 - 标准版本")
-
-# 总结
-print("\n" + "=" * 60)
-print("总结")
-print("=" * 60)
-
-is_free_threading = (
-    hasattr(sys, '_is_gil_enabled') and 
-    callable(sys._is_gil_enabled) and 
-    not sys._is_gil_enabled()
-)
-
-if is_free_threading:
-    print("🎉 恭喜！你正在使用 Python 3.14t (free-threading)")
-    print("   可以学习和测试无 GIL 的真多线程特性")
-    print("\n💡 建议学习内容:")
-    print("   - 多线程性能对比（有GIL vs 无GIL）")
-    print("   - CPU 密集型任务的并行加速")
-    print("   - 线程安全的新注意事项")
-elif sys.version_info >= (3, 13):
-    print("⚠️  你正在使用带 GIL 的 Python 3.13+")
-    print("   如果要学习 free-threading，需要安装 3.13t 或 3.14t")
-    print("\n💡 安装方法:")
-    print("   1. 从 python.org 下载 'free-threaded' 版本")
-    print("   2. 或使用 pyenv: pyenv install 3.14t")
-else:
-    print(f"ℹ️  当前版本: Python {sys.version_info.major}.{sys.version_info.minor}")
-    print("   free-threading 需要 Python 3.13+")
-
-print("\n" + "=" * 60)
+    else:
+        print("⚠️  此版本不支持 GIL 状态检查")
+        print("   (需要 Python 3.13+)")
+
+    # 检查构建配置
+    print("\n" + "=" * 60)
+    print("构建配置")
+    print("=" * 60)
+
+    build = fp["build"]
+    if build["Py_GIL_DISABLED"]:
+        print("✅ Py_GIL_DISABLED: 1")
+        print("   这是 free-threading 构建")
+    else:
+        print("❌ 未启用 Py_GIL_DISABLED")
+        print("   这可能是标准 GIL 构建")
+
+    # 检查 abiflags
+    abiflags = build["abiflags"]
+    print(f"\nABI Flags: {abiflags if abiflags else '(无)'}")
+    if 't' in abiflags:
+        print("✅ 包含 't' 标志 - free-threading 版本")
+    else:
+        print("❌ 不包含 't' 标志 - 标准版本")
+
+    jit = fp["jit"]
+    enabled = {True: "已启用", False: "未启用", None: "未知"}[jit["enabled"]]
+    print(f"\nJIT: {'已编译' if jit['available'] else '未编译'}，{enabled}")
+    print(f"PGO: {'是' if build['pgo'] else '否'}，LTO: {'是' if build['lto'] else '否'}")
+
+    # 运行环境
+    print("\n" + "=" * 60)
+    print("运行环境")
+    print("=" * 60)
+    cpu = fp["cpu"]
+    print(f"CPU 数: {cpu['count']}，可用 CPU: {cpu['affinity'] if cpu['affinity'] is not None else '未知'}")
+    print(f"调频策略: {cpu['governor'] or '未知'}")
+    if fp["loadavg"] is not None:
+        print(f"负载: {' '.join(f'{x:.2f}' for x in fp['loadavg'])}")
+
+    # 总结
+    print("\n" + "=" * 60)
+    print("总结")
+    print("=" * 60)
+
+    if not fp["gil_enabled"]:
+        print("🎉 恭喜！你正在使用 Python 3.14t (free-threading)")
+        print("   可以学习和测试无 GIL 的真多线程特性")
+        print("\n💡 建议学习内容:")
+        print("   - 多线程性能对比（有GIL vs 无GIL）")
+        print("   - CPU 密集型任务的并行加速")
+        print("   - 线程安全的新注意事项")
+    elif sys.version_info >= (3, 13):
+        print("⚠️  你正在使用带 GIL 的 Python 3.13+")
+        print("   如果要学习 free-threading，需要安装 3.13t 或 3.14t")
+        print("\n💡 安装方法:")
+        print("   1. 从 python.org 下载 'free-threaded' 版本")
+        print("   2. 或使用 pyenv: pyenv install 3.14t")
+    else:
+        print(f"ℹ️  当前版本: Python {sys.version_info.major}.{sys.version_info.minor}")
+        print("   free-threading 需要 Python 3.13+")
+
+    print("\n" + "=" * 60)
+
 
+if __name__ == "__main__":
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(fingerprint(), indent=2))
+    else:
+        main()
@@ -0,0 +1,125 @@
+"""Small benchmark harness: warmups, repeated trials, robust statistics, JSON.
+
+Import it from a sibling example (``from bench_harness import ...``).
+
+Run with Python >=3.11
+"""
+
+import gc
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]  # check_python_version.py lives here
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from check_python_version import fingerprint, git_rev, print_environment  # noqa: E402, F401
+
+
+def pin_cpus(n: int | None) -> list[int] | None:
+    """Restrict this process to ``n`` CPUs it may already use; return the mask.
+
+    Pinning keeps runs on different machines comparable and stops the OS
+    from spreading a 2-thread run over 64 cores. Returns None where affinity
+    is not supported (macOS, Windows); ``n`` is then ignored.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if n is not None:
+        if not 0 < n <= len(cpus):
+            raise ValueError(f"cannot pin to {n} CPUs, {len(cpus)} available")
+        cpus = cpus[:n]
+        os.sched_setaffinity(0, cpus)
+    return cpus
+
+
+def measure(fn: Callable[[], object], warmup: int = 1, trials: int = 10) -> list[float]:
+    """Call ``fn`` ``warmup`` times untimed, then time ``trials`` calls (seconds)."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(trials):
+        gc.collect()  # do not bill one trial for the garbage of the previous
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def quantile(data: list[float], q: float) -> float:
+    """Linear-interpolated quantile of sorted ``data``."""
+    pos = (len(data) - 1) * q
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (pos - lo)
+
+
+def quantile_ci(data: list[float], q: float, confidence: float = 0.95) -> tuple[float, float] | None:
+    """Distribution-free confidence interval for the ``q`` quantile of sorted ``data``.
+
+    The number of samples below the true quantile is Binomial(n, q), so the
+    order statistics ``data[j]..data[k]`` bracket it with probability
+    ``P(j < B <= k)``. Picks the narrowest symmetric-tail pair reaching
+    ``confidence``; None if there are too few samples for that.
+    """
+    n = len(data)
+    cdf = []
+    total = 0.0
+    for i in range(n + 1):
+        total += math.comb(n, i) * q ** i * (1 - q) ** (n - i)
+        cdf.append(total)
+    tail = (1 - confidence) / 2
+    j = max((i for i in range(n + 1) if cdf[i] <= tail), default=None)
+    k = min((i for i in range(n + 1) if cdf[i] >= 1 - tail), default=None)
+    if j is None or k is None or k >= n:
+        return None
+    return data[j], data[k]
+
+
+def summarize(samples: list[float], confidence: float = 0.95) -> dict:
+    data = sorted(samples)
+    median_ci = quantile_ci(data, 0.5, confidence)
+    p95_ci = quantile_ci(data, 0.95, confidence)
+    return {
+        "n": len(data),
+        "min": data[0],
+        "max": data[-1],
+        "mean": statistics.fmean(data),
+        "stdev": statistics.stdev(data) if len(data) > 1 else 0.0,
+        "median": statistics.median(data),
+        "median_ci": list(median_ci) if median_ci else None,
+        "p95": quantile(data, 0.95),
+        "p95_ci": list(p95_ci) if p95_ci else None,
+        "confidence": confidence,
+        "samples": list(samples),  # raw trials, for significance tests across runs
+    }
+
+
+def write_json(path: str | Path, benchmark: str, params: dict, results: list[dict],
+               **extra: object) -> None:
+    """Write one run as JSON; ``extra`` adds top-level keys (e.g. a verdict).
+
+    The environment fingerprint and git revision are taken now, so after any
+    CPU pinning and for the code that was actually measured.
+    """
+    doc = {
+        "benchmark": benchmark,
+        "params": params,
+        "fingerprint": fingerprint(),
+        "git_rev": git_rev(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+        **extra,
+    }
+    Path(path).write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+
+
+def fmt_ci(ci: list[float] | None, scale: float = 1e3) -> str:
+    return f"[{ci[0] * scale:.1f}, {ci[1] * scale:.1f}]" if ci else "n/a"
@@ -0,0 +1,90 @@
+"""Interchangeable implementations of the ``work(n)`` benchmark kernel.
+
+Every kernel returns ``sum(int(math.sqrt(i)) for i in range(1, n))``:
+
+- ``loop``     the original pure-Python loop, O(n) bytecode steps;
+- ``isqrt``    closed form over runs of equal ``isqrt(i)``, O(1) arithmetic;
+- ``numpy``    vectorised over blocks of the range (only if NumPy is installed);
+- ``chunked``  fixed-size sub-ranges summed by ``map(math.isqrt, ...)`` in C;
+  each sub-range is an independent unit of work (see ``work_range``).
+
+``int(math.sqrt(i)) == math.isqrt(i)`` while ``i < 2**52``, where the
+double-precision square root is still exact enough to floor correctly.
+
+Run with Python >=3.11:  python kernels.py 1000000
+"""
+
+import math
+import sys
+from collections.abc import Callable
+
+from threading_cpu_bound_compare import work
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Kernel = Callable[[int], int]
+
+KERNELS: dict[str, Kernel] = {}
+
+CHUNK = 1 << 16
+
+
+def kernel(name: str) -> Callable[[Kernel], Kernel]:
+    def deco(fn: Kernel) -> Kernel:
+        KERNELS[name] = fn
+        return fn
+    return deco
+
+
+kernel("loop")(work)
+
+
+@kernel("isqrt")
+def closed_form(n: int) -> int:
+    # isqrt(i) == k for the 2k + 1 values k*k <= i < (k+1)**2; the last run
+    # (k == m) is cut short at n - 1.
+    if n <= 1:
+        return 0
+    m = math.isqrt(n - 1)
+    full = m - 1
+    return 2 * full * (full + 1) * (2 * full + 1) // 6 + full * (full + 1) // 2 + m * (n - m * m)
+
+
+def work_range(lo: int, hi: int) -> int:
+    """``sum(isqrt(i) for lo <= i < hi)``; ranges add up, so they can be split."""
+    return sum(map(math.isqrt, range(lo, hi)))
+
+
+@kernel("chunked")
+def chunked(n: int) -> int:
+    return sum(work_range(lo, min(lo + CHUNK, n)) for lo in range(1, n, CHUNK))
+
+
+if np is not None:
+    @kernel("numpy")
+    def vectorised(n: int) -> int:
+        total = 0
+        for lo in range(1, n, CHUNK):
+            block = np.arange(lo, min(lo + CHUNK, n), dtype=np.float64)
+            total += int(np.sqrt(block).astype(np.int64).sum())
+        return total
+
+
+def verify(sizes: tuple[int, ...] = (0, 1, 2, 3, 4, 5, 80_000, 80_001, CHUNK + 1, 1_000_003)) -> None:
+    """Raise AssertionError unless every kernel agrees with ``loop`` on ``sizes``."""
+    for n in sizes:
+        expected = work(n)
+        for name, fn in KERNELS.items():
+            got = fn(n)
+            if got != expected:
+                raise AssertionError(f"kernel {name!r}: work({n}) = {got}, expected {expected}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    verify()
+    for name, fn in KERNELS.items():
+        print(f"{name:<8} work({n}) = {fn(n)}")
@@ -0,0 +1,150 @@
+"""Ordered parallel map with adaptive chunks and work stealing.
+
+``ex.map(fn, items)`` on a thread pool pays one future per item, and
+handing each worker one fixed slice instead leaves the pool idle behind
+whichever slice holds the expensive items. ``steal_map`` starts each
+worker on an even slice and has it take chunks from the front, sized from
+the measured cost of its previous chunk so one chunk lasts about
+``target`` seconds (one item at first, and never more than half of what
+is left). An idle worker steals the back half of the busiest worker's
+remainder, so expensive items clustered in one slice get spread out.
+
+Each worker's queue is a contiguous index range, i.e. a deque whose owner
+pops from the left and whose thieves split off the right. Thread pools
+only: the workers share the range table and the result list.
+
+Run with Python >=3.11:
+    python parallel_map.py --workload sleep      # skewed short items: vs. static and ex.map
+    python parallel_map.py --items 400 --light 2e-4   # long items: ex.map catches up
+    python parallel_map.py --workload cpu        # needs a free-threaded build to scale
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from bench_harness import measure, print_environment, summarize, write_json
+from kernels import work
+
+
+def steal_map(ex: ThreadPoolExecutor, fn: Callable[[Any], Any], items: Sequence, workers: int,
+              target: float = 1e-3) -> list:
+    """Return ``[fn(x) for x in items]`` computed by ``workers`` tasks on ``ex``."""
+    n = len(items)
+    if n == 0:
+        return []
+    workers = max(1, min(workers, n))
+    bounds = [n * w // workers for w in range(workers + 1)]
+    ranges: list[list[int]] = [[bounds[w], bounds[w + 1]] for w in range(workers)]
+    locks = [threading.Lock() for _ in range(workers)]
+    results: list = [None] * n
+    failed = threading.Event()
+
+    def take(me: int, want: int) -> tuple[int, int] | None:
+        with locks[me]:
+            lo, hi = ranges[me]
+            if lo >= hi:
+                return None
+            end = lo + max(1, min(want, (hi - lo) // 2))
+            ranges[me][0] = end
+            return lo, end
+
+    def steal(me: int) -> bool:
+        victim = max(range(workers), key=lambda w: ranges[w][1] - ranges[w][0])
+        with locks[victim]:
+            lo, hi = ranges[victim]
+            if lo >= hi:
+                return False
+            mid = lo + (hi - lo) // 2  # a single item left goes to the thief
+            ranges[victim][1] = mid
+        with locks[me]:
+            ranges[me][:] = [mid, hi]
+        return True
+
+    def run(me: int) -> None:
+        want = 1
+        try:
+            while not failed.is_set():
+                chunk = take(me, want)
+                if chunk is None:
+                    if steal(me):
+                        continue
+                    return
+                t0 = time.perf_counter()
+                for i in range(*chunk):
+                    results[i] = fn(items[i])
+                per_item = (time.perf_counter() - t0) / (chunk[1] - chunk[0])
+                want = max(1, int(target / per_item)) if per_item > 0 else 2 * want
+        except BaseException:
+            failed.set()
+            raise
+
+    for fut in [ex.submit(run, w) for w in range(workers)]:
+        fut.result()
+    return results
+
+
+def static_map(ex: ThreadPoolExecutor, fn: Callable[[Any], Any], items: Sequence, workers: int) -> list:
+    """One fixed slice per worker, the way ``run_threads`` hands out work."""
+    n = len(items)
+    bounds = [n * w // workers for w in range(workers + 1)]
+    slices = [items[bounds[w]:bounds[w + 1]] for w in range(workers)]
+    return [r for part in ex.map(lambda part: [fn(x) for x in part], slices) for r in part]
+
+
+def skewed(n: int, heavy: float, seed: int = 0) -> list[float]:
+    """Relative item costs: mostly 1, a ``heavy`` fraction 50x, clustered at the front."""
+    rng = random.Random(seed)
+    costs = sorted((50.0 if rng.random() < heavy else 1.0 for _ in range(n)), reverse=True)
+    return costs[: n // 4] + rng.sample(costs[n // 4:], len(costs) - n // 4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", choices=("cpu", "sleep"), default="sleep")
+    parser.add_argument("--items", type=int, help="default 4000 for sleep, 400 for cpu")
+    parser.add_argument("--light", type=float, default=2e-5, help="sleep: seconds per light item")
+    parser.add_argument("--heavy", type=float, default=0.05, help="fraction of 50x items")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+    if args.items is None:
+        args.items = 4_000 if args.workload == "sleep" else 400
+    costs = skewed(args.items, args.heavy)
+    if args.workload == "cpu":
+        items = [int(2_000 * c) for c in costs]
+        fn = work
+    else:
+        # Items short enough that ex.map's future per item is a real cost.
+        items = [args.light * c for c in costs]
+        fn = time.sleep
+
+    with ThreadPoolExecutor(args.workers) as ex:
+        strategies = {
+            "static": lambda: static_map(ex, fn, items, args.workers),
+            "ex.map": lambda: list(ex.map(fn, items)),
+            "steal": lambda: steal_map(ex, fn, items, args.workers),
+        }
+        expected = [fn(x) for x in items]
+        results = []
+        print_environment()
+        print(f"{args.items} {args.workload} items, {args.heavy:.0%} heavy, {args.workers} workers")
+        print(f"{'strategy':<8} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+        for name, run in strategies.items():
+            assert run() == expected, name
+            stats = summarize(measure(run, warmup=1, trials=args.trials))
+            results.append({"strategy": name, **stats})
+            print(f"{name:<8} {stats['median'] * 1e3:>10.1f} {stats['p95'] * 1e3:>8.1f} "
+                  f"{stats['max'] * 1e3:>8.1f}")
+    if args.json:
+        params = {k: v for k, v in vars(args).items() if k != "json"}
+        write_json(args.json, "parallel_map", params, results)
+
+
+if __name__ == "__main__":
+    main()
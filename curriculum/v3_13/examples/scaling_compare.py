@@ -0,0 +1,121 @@
+"""Scale ``work`` kernels across threads, processes and sub-interpreters.
+
+Each kernel from ``kernels.py`` is first checked against the original
+loop and timed serially side by side, showing what a better algorithm or
+vectorisation buys compared with adding workers. Then a fixed batch of equal work items (strong scaling) runs on each backend
+with 1..N workers. Speedup is measured against running the batch serially
+in this process, so pool overhead counts against every backend, and
+efficiency is speedup per worker. The backend with the best speedup is
+recommended for this interpreter build.
+
+``interpreter`` needs ``concurrent.futures.InterpreterPoolExecutor``
+(Python 3.14+) and is skipped elsewhere.
+
+Run with Python >=3.13:
+    python scaling_compare.py --cpus 8 --json scaling.json
+"""
+
+import argparse
+import concurrent.futures as cf
+import os
+import sys
+
+from bench_harness import measure, pin_cpus, print_environment, summarize, write_json
+from kernels import KERNELS, verify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_pool(backend: str, workers: int) -> cf.Executor:
+    if backend == "thread":
+        return cf.ThreadPoolExecutor(workers)
+    if backend == "process":
+        return cf.ProcessPoolExecutor(workers)
+    # Sub-interpreters start with a fresh sys.path; let them import this directory.
+    return cf.InterpreterPoolExecutor(workers, initializer=exec,
+                                      initargs=(f"import sys; sys.path.insert(0, {HERE!r})",))
+
+
+def backends() -> list[str]:
+    names = ["thread", "process"]
+    if hasattr(cf, "InterpreterPoolExecutor"):
+        names.append("interpreter")
+    return names
+
+
+def worker_counts(limit: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def recommend(rows: list[dict], gil: bool) -> str:
+    parallel = [r for r in rows if r["workers"] > 1]
+    if not parallel:
+        return "serial: only one worker was measured, nothing can run in parallel"
+    best = max(parallel, key=lambda r: r["speedup"])
+    if best["speedup"] < 1.1:
+        return f"serial: no backend beat one in-process run (best {best['backend']} {best['speedup']:.2f}x)"
+    why = ("GIL enabled: only processes and sub-interpreters run Python code in parallel" if gil
+           else "GIL disabled: threads run Python code in parallel")
+    return (f"{best['backend']}: {best['speedup']:.2f}x at {best['workers']} workers, "
+            f"efficiency {best['efficiency']:.0%} ({why})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kernels", nargs="+", choices=sorted(KERNELS), default=list(KERNELS))
+    parser.add_argument("--backends", nargs="+", choices=("thread", "process", "interpreter"),
+                        default=backends())
+    parser.add_argument("--max-workers", type=int, help="default: CPUs available after pinning")
+    parser.add_argument("--items", type=int, default=32, help="work items per batch")
+    parser.add_argument("--work-items", type=int, default=80_000)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--cpus", type=int, help="pin to this many CPUs")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+    cpus = pin_cpus(args.cpus)
+    limit = args.max_workers or (len(cpus) if cpus else os.cpu_count() or 1)
+    batch = [args.work_items] * args.items
+    verify()
+    print_environment()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+    serial = {}
+    print(f"{'kernel':<8} {'serial ms':>10} {'vs loop':>8}   ({args.items} items, results verified)")
+    for name in args.kernels:
+        fn = KERNELS[name]
+        serial[name] = summarize(measure(lambda: list(map(fn, batch)), args.warmup, args.trials))
+        base = serial[args.kernels[0]]["median"]
+        print(f"{name:<8} {serial[name]['median'] * 1e3:>10.2f} {base / serial[name]['median']:>7.1f}x")
+
+    results = [{"kernel": name, "backend": "serial", "workers": 0, **stats} for name, stats in serial.items()]
+    advice = {}
+    for name in args.kernels:
+        fn = KERNELS[name]
+        rows = []
+        print(f"\n{'kernel':<8} {'backend':<12} {'workers':>7} {'median ms':>10} {'speedup':>8} {'efficiency':>10}")
+        for backend in args.backends:
+            for workers in worker_counts(limit):
+                with make_pool(backend, workers) as pool:
+                    stats = summarize(measure(lambda: list(pool.map(fn, batch)), args.warmup, args.trials))
+                speedup = serial[name]["median"] / stats["median"]
+                row = {"kernel": name, "backend": backend, "workers": workers, "speedup": speedup,
+                       "efficiency": speedup / workers, **stats}
+                rows.append(row)
+                print(f"{name:<8} {backend:<12} {workers:>7} {stats['median'] * 1e3:>10.2f} "
+                      f"{speedup:>7.2f}x {row['efficiency']:>10.0%}")
+        advice[name] = recommend(rows, gil)
+        print(f"recommended for {name}: {advice[name]}")
+        results += rows
+    if args.json:
+        params = {k: v for k, v in vars(args).items() if k != "json"}
+        write_json(args.json, "scaling_compare", params, results, recommended=advice)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 """Compare scaling of CPU-bound threads under regular vs. free-threaded builds.
 
-Run with Python >=3.13 (free-threaded build optional)
+Each thread count gets warmup runs and repeated trials; the table shows
+the median and p95 with distribution-free confidence intervals, and
+``--json`` writes the same numbers for comparing GIL and free-threaded
+interpreters. ``--cpus`` pins the process to that many CPUs first.
+
+Run with Python >=3.13 (free-threaded build optional):
+    python threading_cpu_bound_compare.py --cpus 8 --json gil.json
 """
 
+import argparse
 import math
-import time
 from concurrent.futures import ThreadPoolExecutor
 
+from bench_harness import fmt_ci, measure, pin_cpus, print_environment, summarize, write_json
+
 
 def work(n: int) -> int:
     s = 0
@@ -15,21 +23,39 @@ def work(n: int) -> int:
     return s
 
 
-def timed(fn, *args, **kwargs):
-    t0 = time.perf_counter()
-    r = fn(*args, **kwargs)
-    t1 = time.perf_counter()
-    return r, t1 - t0
-
-
-def run_threads(work_items: int, reps: int, threads: int) -> float:
+def run_threads(work_items: int, reps: int, threads: int) -> list[int]:
     with ThreadPoolExecutor(max_workers=threads) as ex:
-        _, dur = timed(list, ex.map(work, [work_items] * reps))
-    return dur
-
-
-for threads in (1, 2, 4, 8):
-    duration = run_threads(work_items=80_000, reps=threads, threads=threads)
-    print(f"threads={threads} duration={duration:.3f}s")
-
-
+        return list(ex.map(work, [work_items] * reps))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--work-items", type=int, default=80_000)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--cpus", type=int, help="pin to this many CPUs")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+    pin_cpus(args.cpus)
+
+    results = []
+    print_environment()
+    print(f"{'threads':>7} {'median ms':>10} {'95% CI':>18} {'p95 ms':>8} {'95% CI':>18} {'speedup':>8}")
+    for threads in args.threads:
+        # Weak scaling: one unit of work per thread, so ideal time stays flat.
+        samples = measure(lambda: run_threads(args.work_items, threads, threads), args.warmup, args.trials)
+        stats = summarize(samples)
+        first = results[0] if results else {"threads": threads, **stats}
+        # Throughput relative to the first row, which need not be one thread.
+        speedup = threads / first["threads"] * first["median"] / stats["median"]
+        results.append({"threads": threads, "speedup": speedup, **stats})
+        print(f"{threads:>7} {stats['median'] * 1e3:>10.1f} {fmt_ci(stats['median_ci']):>18} "
+              f"{stats['p95'] * 1e3:>8.1f} {fmt_ci(stats['p95_ci']):>18} {speedup:>7.2f}x")
+    if args.json:
+        params = {k: v for k, v in vars(args).items() if k != "json"}
+        write_json(args.json, "threading_cpu_bound_compare", params, results)
+
+
+if __name__ == "__main__":
+    main()
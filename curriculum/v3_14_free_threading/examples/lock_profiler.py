@@ -0,0 +1,458 @@
+"""Lock contention profiler: wait time, hold time and contention per call site.
+
+Without the GIL, threads really do run into each other's locks, and a lock
+that was free under the GIL can become the bottleneck. ``Lock``, ``RLock``
+and ``Condition`` here are drop-in replacements for the ``threading`` ones
+that record, per lock and per acquiring call site:
+
+- acquires, and how many of them found the lock taken (contended);
+- total and worst time spent waiting for it;
+- mean and worst time it was then held;
+- failed non-blocking / timed-out acquires.
+
+Contended acquires are always timed and attributed to their call site;
+the lock was busy anyway, so the extra clock reads are hidden in the wait.
+An uncontended acquire only bumps a counter, except for every
+``sample``-th one, which is timed to estimate hold times. Statistics live
+on the lock and are written only by the thread holding it, so profiling
+adds no shared state to fight over. ``LOCK_PROFILE_SAMPLE`` sets the
+default sample interval and ``LOCK_PROFILE=0`` makes the factories return
+the plain ``threading`` primitives.
+
+    from lock_profiler import Lock, PROFILER
+    cache_lock = Lock("cache")
+    ...
+    print(PROFILER.report())
+
+Run with Python >=3.11 (free-threaded build to see real contention):
+    python lock_profiler.py --threads 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from time import perf_counter_ns
+
+ENABLED = os.environ.get("LOCK_PROFILE", "1") != "0"
+SAMPLE = int(os.environ.get("LOCK_PROFILE_SAMPLE", "16"))
+
+# Per-site counters, in this order. TIMED counts the acquires whose hold
+# time was measured; the ``None`` site holds the lock's exact ACQUIRES.
+ACQUIRES, CONTENDED, FAILED, WAIT_NS, WAIT_MAX, TIMED, HOLD_NS, HOLD_MAX = range(8)
+
+# Condition calls into its lock from these; the call site is their caller.
+_COND_ENTER = threading.Condition.__enter__.__code__
+_COND_RESTORE = threading.Condition._acquire_restore.__code__
+
+
+class Profiler:
+    """Collects the statistics of every lock created with it, keyed by lock name.
+
+    Locks sharing a name (by default, created on the same line) are
+    reported together, including ones already garbage-collected.
+    """
+
+    def __init__(self, sample: int = SAMPLE) -> None:
+        if sample < 1:
+            raise ValueError(f"sample interval must be >= 1, got {sample}")
+        self.sample = sample
+        self._live: dict[int, tuple[str, dict]] = {}
+        self._retired: dict[tuple, list[int]] = {}
+        self._mutex = threading.Lock()
+
+    def register(self, lock: "ProfiledLock") -> None:
+        with self._mutex:
+            self._live[id(lock)] = (lock.name, lock._stats)
+        weakref.finalize(lock, self._retire, id(lock))
+
+    def _retire(self, key: int) -> None:
+        with self._mutex:
+            name, stats = self._live.pop(key)
+            _merge(self._retired, name, stats)
+
+    def reset(self) -> None:
+        with self._mutex:
+            self._retired.clear()
+            for _, stats in self._live.values():
+                for row in list(stats.values()):
+                    row[:] = [0] * 8
+
+    def snapshot(self) -> list[dict]:
+        """Per-lock statistics with their call sites, most total wait first.
+
+        Times are in seconds. Lock acquire counts are exact; a site's
+        acquire count and all hold times are estimated from the sampled
+        acquires when ``sample`` > 1. Locks in use keep counting while
+        this runs, so the numbers can be off by the acquires in flight.
+        """
+        merged: dict[tuple, list[int]] = {}
+        with self._mutex:
+            for (name, site), row in self._retired.items():
+                merged[name, site] = list(row)
+            live = list(self._live.values())
+        for name, stats in live:
+            _merge(merged, name, stats)
+        locks: dict[str, dict] = {}
+        for (name, site), s in merged.items():
+            lock = locks.setdefault(name, {"lock": name, "acquires": 0, "sites": []})
+            if site is None:
+                lock["acquires"] = s[ACQUIRES]
+                continue
+            lock["sites"].append({
+                "site": describe(site),
+                "acquires": s[CONTENDED] + (s[TIMED] - s[CONTENDED]) * self.sample,
+                "contended": s[CONTENDED],
+                "failed": s[FAILED],
+                "wait_secs": s[WAIT_NS] / 1e9,
+                "wait_max_secs": s[WAIT_MAX] / 1e9,
+                "hold_mean_secs": s[HOLD_NS] / s[TIMED] / 1e9 if s[TIMED] else None,
+                "hold_max_secs": s[HOLD_MAX] / 1e9,
+                "_timed": s[TIMED],
+                "_hold_ns": s[HOLD_NS],
+            })
+        for lock in locks.values():
+            sites = sorted(lock["sites"], key=_rank, reverse=True)
+            timed = sum(r.pop("_timed") for r in sites)
+            hold_ns = sum(r.pop("_hold_ns") for r in sites)
+            lock.update({
+                "contended": sum(r["contended"] for r in sites),
+                "failed": sum(r["failed"] for r in sites),
+                "wait_secs": sum(r["wait_secs"] for r in sites),
+                "wait_max_secs": max((r["wait_max_secs"] for r in sites), default=0.0),
+                "hold_mean_secs": hold_ns / timed / 1e9 if timed else None,
+                "hold_max_secs": max((r["hold_max_secs"] for r in sites), default=0.0),
+                "sites": sites,
+            })
+        return sorted(locks.values(), key=_rank, reverse=True)
+
+    def report(self, top: int = 10, sites: int = 3) -> str:
+        """The ``top`` locks by total wait time, each with its worst call sites."""
+        lines = [f"{'lock / site':<48} {'acquires':>9} {'contended':>9} {'rate':>6} {'wait ms':>9} "
+                 f"{'max wait ms':>11} {'hold us':>8} {'max hold ms':>11}"]
+        for lock in self.snapshot()[:top]:
+            lines.append(_line(lock["lock"], lock))
+            lines.extend(_line("  " + r["site"], r) for r in lock["sites"][:sites])
+        return "\n".join(lines)
+
+
+def _merge(into: dict, name: str, stats: dict) -> None:
+    for site, s in list(stats.items()):
+        m = into.setdefault((name, site), [0] * 8)
+        for i in (ACQUIRES, CONTENDED, FAILED, WAIT_NS, TIMED, HOLD_NS):
+            m[i] += s[i]
+        m[WAIT_MAX] = max(m[WAIT_MAX], s[WAIT_MAX])
+        m[HOLD_MAX] = max(m[HOLD_MAX], s[HOLD_MAX])
+
+
+def _rank(r: dict) -> tuple:
+    return r["wait_secs"], r["contended"], r["acquires"]
+
+
+def _line(label: str, r: dict) -> str:
+    rate = f"{r['contended'] / r['acquires']:.1%}" if r["acquires"] else "n/a"
+    hold = f"{r['hold_mean_secs'] * 1e6:.2f}" if r["hold_mean_secs"] is not None else "n/a"
+    if len(label) > 48:
+        label = "..." + label[-45:]
+    return (f"{label:<48} {r['acquires']:>9} {r['contended']:>9} {rate:>6} {r['wait_secs'] * 1e3:>9.2f} "
+            f"{r['wait_max_secs'] * 1e3:>11.3f} {hold:>8} {r['hold_max_secs'] * 1e3:>11.3f}")
+
+
+def describe(site: tuple) -> str:
+    code, lineno = site
+    return f"{Path(code.co_filename).name}:{lineno} ({code.co_qualname})"
+
+
+PROFILER = Profiler()
+
+
+def _creation_site() -> str:
+    frame = sys._getframe(2)  # the caller of Lock()/RLock()
+    return describe((frame.f_code, frame.f_lineno))
+
+
+class ProfiledLock:
+    """A ``threading.Lock`` that reports to a Profiler; see ``Lock``."""
+
+    __slots__ = ("name", "_lock", "_profiler", "_sample", "_stats", "_totals", "_site", "_waited",
+                 "_since", "__weakref__")
+    _factory = staticmethod(threading.Lock)
+
+    def __init__(self, name: str, profiler: Profiler) -> None:
+        self.name = name
+        self._lock = self._factory()
+        self._profiler = profiler
+        self._sample = profiler.sample
+        self._totals = [0] * 8
+        self._stats: dict[tuple | None, list[int]] = {None: self._totals}
+        # Written by the thread that acquired, read by the one that releases.
+        self._site: tuple | None = None
+        self._waited = -1
+        self._since = 0  # 0: this acquire is not timed
+        profiler.register(self)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._take(blocking, timeout)
+
+    __enter__ = acquire
+
+    def _take(self, blocking: bool, timeout: float) -> bool:
+        lock = self._lock
+        if lock.acquire(False):
+            totals = self._totals
+            totals[ACQUIRES] += 1
+            if totals[ACQUIRES] % self._sample:
+                self._since = 0
+                return True
+            waited = -1
+        elif not blocking:
+            self._failed()
+            return False
+        else:
+            t0 = perf_counter_ns()
+            if not lock.acquire(True, timeout):
+                self._failed()
+                return False
+            waited = perf_counter_ns() - t0
+            self._totals[ACQUIRES] += 1
+        frame = sys._getframe(2)  # the caller of acquire/__enter__
+        if frame.f_code is _COND_ENTER:
+            frame = frame.f_back
+        elif frame.f_code is _COND_RESTORE:
+            frame = frame.f_back.f_back  # Condition.wait's caller
+        self._site = (frame.f_code, frame.f_lineno)
+        self._waited = waited
+        self._since = perf_counter_ns()
+        return True
+
+    def _failed(self) -> None:
+        frame = sys._getframe(3)
+        site = (frame.f_code, frame.f_lineno)
+        with self._profiler._mutex:  # not holding the lock, so serialize with other losers
+            row = self._stats.get(site)
+            if row is None:
+                row = self._stats[site] = [0] * 8
+            row[FAILED] += 1
+
+    def release(self) -> None:
+        if self._since:
+            self._record()
+        self._lock.release()
+
+    def _record(self) -> None:
+        """Account the timed acquire now ending; the caller still holds the lock."""
+        held = perf_counter_ns() - self._since
+        stats = self._stats
+        s = stats.get(self._site)
+        if s is None:
+            s = stats[self._site] = [0] * 8
+        s[TIMED] += 1
+        s[HOLD_NS] += held
+        if held > s[HOLD_MAX]:
+            s[HOLD_MAX] = held
+        waited = self._waited
+        if waited >= 0:
+            s[CONTENDED] += 1
+            s[WAIT_NS] += waited
+            if waited > s[WAIT_MAX]:
+                s[WAIT_MAX] = waited
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def _is_owned(self) -> bool:
+        # What Condition assumes without this hook, minus the profiled probe.
+        return self._lock.locked()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name!r} {'locked' if self.locked() else 'unlocked'}>"
+
+
+class ProfiledRLock(ProfiledLock):
+    """A ``threading.RLock`` that reports to a Profiler; see ``RLock``.
+
+    Only the outermost acquire/release pair is counted and timed.
+    ``Condition.wait`` releases the lock fully; the re-acquire after a
+    notify counts as an acquire at the site of the outermost one.
+    """
+
+    __slots__ = ("_depth",)
+    _factory = staticmethod(threading.RLock)
+
+    def __init__(self, name: str, profiler: Profiler) -> None:
+        super().__init__(name, profiler)
+        self._depth = 0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._depth and self._lock._is_owned():
+            self._lock.acquire()
+            self._depth += 1
+            return True
+        if not self._take(blocking, timeout):
+            return False
+        self._depth = 1
+        return True
+
+    __enter__ = acquire
+
+    def release(self) -> None:
+        if not self._lock._is_owned():
+            raise RuntimeError("cannot release un-acquired lock")
+        if self._depth > 1:
+            self._depth -= 1
+            self._lock.release()
+            return
+        self._depth = 0
+        super().release()
+
+    def locked(self) -> bool:
+        if self._lock.acquire(False):
+            self._lock.release()
+            return self._depth > 0
+        return True
+
+    # The hooks threading.Condition uses to drop and restore a nested RLock.
+
+    def _is_owned(self) -> bool:
+        return self._lock._is_owned()
+
+    def _release_save(self) -> tuple:
+        site, depth = self._site, self._depth
+        if self._since:
+            self._record()
+        self._depth = 0
+        for _ in range(depth):
+            self._lock.release()
+        return site, depth
+
+    def _acquire_restore(self, saved: tuple) -> None:
+        site, depth = saved
+        lock = self._lock
+        if lock.acquire(False):
+            waited = -1
+        else:
+            t0 = perf_counter_ns()
+            lock.acquire()
+            waited = perf_counter_ns() - t0
+        for _ in range(depth - 1):
+            lock.acquire()
+        totals = self._totals
+        totals[ACQUIRES] += 1
+        self._depth = depth
+        if waited < 0 and totals[ACQUIRES] % self._sample:
+            self._since = 0
+            return
+        self._site, self._waited = site, waited
+        self._since = perf_counter_ns()
+
+
+def Lock(name: str | None = None, profiler: Profiler | None = None):
+    """A profiled ``threading.Lock``; ``name`` defaults to where it was created."""
+    if not ENABLED:
+        return threading.Lock()
+    return ProfiledLock(name or _creation_site(), profiler or PROFILER)
+
+
+def RLock(name: str | None = None, profiler: Profiler | None = None):
+    """A profiled ``threading.RLock``; ``name`` defaults to where it was created."""
+    if not ENABLED:
+        return threading.RLock()
+    return ProfiledRLock(name or _creation_site(), profiler or PROFILER)
+
+
+def Condition(lock=None, name: str | None = None, profiler: Profiler | None = None) -> threading.Condition:
+    """A ``threading.Condition`` over a profiled lock (a new profiled RLock by default).
+
+    Time spent inside ``wait()`` is not hold time: the lock is released
+    while waiting, and the re-acquire after a notify is recorded like any
+    other acquire.
+    """
+    if lock is None:
+        lock = threading.RLock() if not ENABLED else ProfiledRLock(name or _creation_site(),
+                                                                   profiler or PROFILER)
+    return threading.Condition(lock)
+
+
+def overhead(n: int = 200_000) -> list[float]:
+    """Nanoseconds per uncontended ``with lock:``: plain, profiled, profiled with every acquire timed."""
+    locks = [threading.Lock(), ProfiledLock("overhead", Profiler()), ProfiledLock("overhead", Profiler(sample=1))]
+    result = []
+    for lock in locks:
+        t0 = perf_counter_ns()
+        for _ in range(n):
+            with lock:
+                pass
+        result.append((perf_counter_ns() - t0) / n)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=20_000, help="operations per thread")
+    args = parser.parse_args()
+    # Only the demo needs the fingerprint; importing the profiler leaves sys.path alone.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # check_python_version.py
+    from check_python_version import print_environment
+    print_environment()
+
+    # Three shared structures: a hot counter behind one global lock, a
+    # striped dict whose stripes rarely collide, and a bounded queue.
+    global_lock = Lock("counter")
+    stripes = [Lock(f"stripe[{i}]") for i in range(16)]
+    counts = [0] * 16
+    total = 0
+    items: list[int] = []
+    cond = Condition(name="queue")
+
+    def produce(n: int) -> None:
+        for i in range(n):
+            with cond:
+                while len(items) >= 64:
+                    cond.wait()
+                items.append(i)
+                cond.notify_all()
+
+    def consume(n: int) -> None:
+        for _ in range(n):
+            with cond:
+                while not items:
+                    cond.wait()
+                items.pop()
+                cond.notify_all()
+
+    def work(me: int) -> None:
+        nonlocal total
+        for i in range(args.ops):
+            with global_lock:
+                total += 1
+            s = (me * 7 + i) % 16
+            with stripes[s]:
+                counts[s] += 1
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in range(args.threads)]
+    threads += [threading.Thread(target=produce, args=(args.ops,)),
+                threading.Thread(target=consume, args=(args.ops,))]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    assert total == sum(counts) == args.threads * args.ops
+
+    print(f"{args.threads} threads x {args.ops} ops in {elapsed * 1e3:.0f} ms\n")
+    print(PROFILER.report(top=5))
+    plain, sampled, timed = overhead()
+    print(f"\nuncontended with-lock: plain {plain:.0f} ns, profiled {sampled:.0f} ns "
+          f"(sample={PROFILER.sample}), {timed:.0f} ns with every acquire timed")
+
+
+if __name__ == "__main__":
+    main()